@@ -0,0 +1,353 @@
+# flask-api-server/asgi_app.py
+# app.py(WSGI)와 같은 /api/v1/run-job, /healthz 계약을 asyncio 위에서 제공하는 ASGI 서빙 모드.
+# - Kubernetes 호출은 kubernetes_asyncio로 처리하므로 waitForCompletion 요청이 OS 스레드/워커를 점유하지 않는다.
+# - 하나의 이벤트 루프에서 수천 개의 Job 대기와 로그 스트림을 처리할 수 있다.
+# - KADEMLIA_ENABLED=true면 Kademlia 서버를 같은 루프에서 함께 띄운다.
+#   이때 공급자 하트비트(heartbeat.py ProviderView)를 주기적으로 조회해 GET /api/v1/providers로 제공한다.
+#   공급자 목록은 PROVIDER_ADDRESSES(쉼표 구분) 또는 NodeRegistry(NODE_REGISTRY_ADDRESS, BESU_RPC)에서 가져온다.
+#
+# 실행 예: uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+
+import asyncio
+import json
+import os
+import secrets
+import sys
+from datetime import datetime
+
+from quart import Quart, request, jsonify
+
+from requester.utils import build_job_manifest
+from requester.async_utils import (
+    load_kube,
+    create_job_from_manifest,
+    JobWatcher,
+    get_pod_logs,
+    stream_pod_logs,
+    get_job_pod_name,
+    delete_job,
+)
+
+app = Quart(__name__)
+
+# 이벤트 루프 시작 시 채워지는 공유 객체
+app.config["KUBE_API"] = None
+app.config["JOB_WATCHER"] = None
+app.config["KADEMLIA_SERVER"] = None
+app.config["PROVIDER_VIEW"] = None
+app.config["MARKET_CLIENT"] = None
+# fire-and-forget 백그라운드 작업이 GC로 중간에 사라지지 않도록 참조를 보관
+app.config["BACKGROUND_TASKS"] = set()
+# Job별로 진행 중인 마지막 DHT 저장 작업 (같은 Job의 저장은 순서대로 실행, 완료되면 제거)
+app.config["JOB_PUBLISH_TASKS"] = {}
+
+
+def parse_bootstrap_nodes(raw: str):
+    """
+    KADEMLIA_BOOTSTRAP_NODES(JSON 문자열)를 (ip, port) 튜플 리스트로 변환. 형식 오류 시 빈 리스트.
+    """
+    try:
+        nodes = json.loads(raw)
+        return [tuple(node) for node in nodes]
+    except Exception as e:
+        app.logger.error(f"Kademlia 부트스트랩 노드 파싱 실패: {e}. 부트스트랩 없이 시작.")
+        return []
+
+
+@app.before_serving
+async def startup():
+    try:
+        app.config["KUBE_API"] = await load_kube(
+            os.getenv("KUBECONFIG_PATH"),
+            pool_maxsize=int(os.getenv("KUBE_POOL_MAXSIZE", "1000")),
+        )
+        # 네임스페이스당 Job watch 하나로 모든 waitForCompletion 요청을 처리
+        app.config["JOB_WATCHER"] = JobWatcher(app.config["KUBE_API"])
+        print("[ASGI API] Kubernetes asyncio 클라이언트가 로드되었습니다.")
+    except Exception as e:
+        print(f"[ASGI API] Kubernetes 클라이언트 로드 실패: {e}", file=sys.stderr)
+        sys.exit(1) # 클라이언트 로드 실패 시 앱 시작 중단
+
+    if os.getenv("KADEMLIA_ENABLED", "false").lower() == "true":
+        # Kademlia는 asyncio 네이티브이므로 별도 스레드 없이 같은 루프에서 실행한다.
+        from kademlia.network import Server
+
+        listen_ip = os.getenv("KADEMLIA_LISTEN_IP", "0.0.0.0")
+        listen_port = int(os.getenv("KADEMLIA_LISTEN_PORT", "8468"))
+        bootstrap_nodes = parse_bootstrap_nodes(os.getenv("KADEMLIA_BOOTSTRAP_NODES", "[]"))
+
+        server = Server()
+        await server.listen(listen_port, listen_ip)
+        if bootstrap_nodes:
+            try:
+                await server.bootstrap(bootstrap_nodes)
+            except Exception as e:
+                app.logger.error(f"Kademlia 부트스트랩 실패: {e}. 단독 모드로 계속 실행합니다.")
+        app.config["KADEMLIA_SERVER"] = server
+        print(f"[ASGI API] Kademlia 노드가 {listen_ip}:{listen_port}에서 같은 이벤트 루프로 실행 중입니다.")
+        start_provider_view(server)
+
+
+def start_provider_view(server) -> None:
+    """
+    공급자 하트비트 뷰를 만들고 백그라운드에서 주기적으로 갱신한다.
+    """
+    from heartbeat import ProviderView
+
+    view = ProviderView(server)
+    app.config["PROVIDER_VIEW"] = view
+
+    addresses = [a.strip() for a in os.getenv("PROVIDER_ADDRESSES", "").split(",") if a.strip()]
+    registry = os.getenv("NODE_REGISTRY_ADDRESS")
+    if addresses:
+        providers_fn = lambda: addresses
+    elif registry:
+        from requester.chain import market_client_from_config
+
+        market = market_client_from_config({"besu": {"node_registry_address": registry}})
+        app.config["MARKET_CLIENT"] = market
+        # requests 기반 동기 호출이므로 스레드 풀에서 실행해 이벤트 루프를 막지 않는다.
+        providers_fn = lambda: asyncio.get_running_loop().run_in_executor(None, market.get_node_list)
+    else:
+        app.logger.warning("PROVIDER_ADDRESSES/NODE_REGISTRY_ADDRESS가 없어 공급자 뷰를 갱신하지 않습니다.")
+        return
+    interval = float(os.getenv("PROVIDER_REFRESH_INTERVAL", "5"))
+    spawn_background(view.watch(providers_fn, interval=interval))
+
+
+@app.after_serving
+async def shutdown():
+    for task in list(app.config["BACKGROUND_TASKS"]):
+        task.cancel()
+    if app.config["JOB_WATCHER"] is not None:
+        await app.config["JOB_WATCHER"].close()
+    if app.config["KADEMLIA_SERVER"] is not None:
+        app.config["KADEMLIA_SERVER"].stop()
+    if app.config["MARKET_CLIENT"] is not None:
+        app.config["MARKET_CLIENT"].close()
+    if app.config["KUBE_API"] is not None:
+        await app.config["KUBE_API"].close()
+
+
+async def publish_job_metadata(job_name: str, metadata: dict) -> None:
+    """
+    Job 메타데이터를 Kademlia DHT에 저장 (Kademlia가 활성화된 경우에만). 실패해도 요청 처리에는 영향 없음.
+    DHT 값은 통째로 덮어써지므로 호출자는 매번 전체 레코드를 넘긴다.
+    """
+    server = app.config["KADEMLIA_SERVER"]
+    if server is None:
+        return
+    try:
+        await server.set(job_name, json.dumps(metadata))
+    except Exception as e:
+        app.logger.warning(f"Job '{job_name}' 메타데이터 DHT 저장 실패: {e}")
+
+
+def spawn_background(coro) -> asyncio.Task:
+    """
+    응답을 막지 않는 백그라운드 작업 실행. 완료될 때까지 참조를 유지한다.
+    """
+    task = asyncio.ensure_future(coro)
+    app.config["BACKGROUND_TASKS"].add(task)
+    task.add_done_callback(app.config["BACKGROUND_TASKS"].discard)
+    return task
+
+
+def schedule_job_publish(job_name: str, metadata: dict) -> None:
+    """
+    publish_job_metadata를 백그라운드에서 실행하되, 같은 Job의 이전 저장이 끝난 뒤에 실행한다.
+    (DHT 저장은 노드 탐색 때문에 걸리는 시간이 제각각이라, 나중 상태가 먼저 저장된 뒤 이전 상태로 덮이는 것을 막음)
+    """
+    if app.config["KADEMLIA_SERVER"] is None:
+        return
+    tasks = app.config["JOB_PUBLISH_TASKS"]
+    previous = tasks.get(job_name)
+
+    async def _publish():
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        await publish_job_metadata(job_name, metadata)
+
+    task = spawn_background(_publish())
+    tasks[job_name] = task
+
+    def _forget(t):
+        if tasks.get(job_name) is t:
+            del tasks[job_name]
+
+    task.add_done_callback(_forget)
+
+
+# --- 헬스 체크 엔드포인트 ---
+@app.route('/healthz', methods=['GET'])
+async def healthz():
+    """
+    서버의 상태를 확인하는 헬스 체크 엔드포인트.
+    """
+    return jsonify({"status": "healthy"}), 200
+
+
+# --- 공급자 상태 조회 엔드포인트 (ASGI 모드 전용) ---
+@app.route('/api/v1/providers', methods=['GET'])
+async def providers():
+    """
+    하트비트가 live인 공급자 목록 (여유 CPU 내림차순). 마지막 갱신 결과만 사용하므로 DHT 조회 없이 응답한다.
+    쿼리: minCpuMillis, minRamMb
+    """
+    view = app.config["PROVIDER_VIEW"]
+    if view is None:
+        return jsonify({"error": "Kademlia가 비활성화되어 공급자 상태를 조회할 수 없습니다."}), 503
+    try:
+        min_cpu = int(request.args.get("minCpuMillis", 0))
+        min_ram = int(request.args.get("minRamMb", 0))
+    except ValueError:
+        return jsonify({"error": "minCpuMillis와 minRamMb는 정수여야 합니다."}), 400
+    live = view.live_providers(min_cpu_millis=min_cpu, min_ram_mb=min_ram)
+    return jsonify({"providers": live, "count": len(live)}), 200
+
+
+# --- Job 생성 및 실행 API 엔드포인트 ---
+@app.route('/api/v1/run-job', methods=['POST'])
+async def run_job():
+    """
+    웹 요청을 받아 Kubernetes Job을 생성하고 실행합니다. (app.py와 동일한 요청/응답 형식)
+    """
+    data = await request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "요청 본문(JSON)이 필요합니다."}), 400
+
+    image = data.get('image', 'ubuntu:20.04')
+    command = data.get('command')
+    args = data.get('args')
+    namespace = data.get('namespace', 'default')
+    runtime_class = data.get('runtimeClass', 'kata')
+    cpu_request = data.get('cpuRequest', '500m')
+    cpu_limit = data.get('cpuLimit', '1')
+    mem_request = data.get('memRequest', '512Mi')
+    mem_limit = data.get('memLimit', '1Gi')
+
+    node_selector_pairs = data.get('nodeSelector')
+    node_selector = {}
+    if node_selector_pairs:
+        if not isinstance(node_selector_pairs, list):
+            return jsonify({"error": "nodeSelector는 'key=value' 형태의 문자열 리스트여야 합니다."}), 400
+        for kv in node_selector_pairs:
+            if "=" not in kv:
+                return jsonify({"error": f"잘못된 nodeSelector 형식: '{kv}' (기대: key=value)"}), 400
+            k, v = kv.split("=", 1)
+            node_selector[k] = v
+
+    delete_after = data.get('deleteAfter', True)
+    wait_for_completion = data.get('waitForCompletion', False)
+    wait_timeout = data.get('waitTimeoutSeconds', 600)
+
+    if not command and not args:
+        app.logger.warning("Job에 'command' 또는 'args'가 지정되지 않았습니다. 이미지가 자체 명령을 포함하지 않으면 Job이 즉시 완료될 수 있습니다.")
+
+    # 동시 요청이 많으므로 초 단위 타임스탬프 뒤에 난수 접미사를 붙여 이름 충돌을 막는다.
+    job_name = f"web-kata-job-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{secrets.token_hex(3)}"
+
+    try:
+        manifest = build_job_manifest(
+            name=job_name,
+            namespace=namespace,
+            image=image,
+            command=command,
+            args=args,
+            runtime_class=runtime_class,
+            cpu_request=cpu_request,
+            cpu_limit=cpu_limit,
+            mem_request=mem_request,
+            mem_limit=mem_limit,
+            node_selector=node_selector if node_selector else None
+        )
+    except Exception as e:
+        app.logger.error(f"Job 매니페스트 생성 중 오류 발생: {e}")
+        return jsonify({"error": f"Job 매니페스트 생성 실패: {e}"}), 500
+
+    api = app.config["KUBE_API"]
+    try:
+        await create_job_from_manifest(api, manifest)
+    except Exception as e:
+        app.logger.error(f"Job '{job_name}' 제출 중 오류 발생: {e}")
+        return jsonify({"error": f"Job 제출 실패: {e}"}), 500
+
+    app.logger.info(f"Job '{namespace}/{job_name}'이(가) Kubernetes에 성공적으로 제출되었습니다.")
+    job_metadata = {
+        "job_name": job_name,
+        "namespace": namespace,
+        "image": image,
+        "status": "submitted",
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    schedule_job_publish(job_name, job_metadata)
+
+    response_data = {
+        "status": "Job Submitted",
+        "jobName": job_name,
+        "namespace": namespace,
+        "message": f"Job '{job_name}'이(가) 성공적으로 제출되었습니다. Job ID: {job_name}"
+    }
+
+    if not wait_for_completion:
+        return jsonify(response_data), 202
+
+    app.logger.info(f"Job '{job_name}' 완료를 대기 중... (타임아웃: {wait_timeout}초)")
+    try:
+        job_status = await app.config["JOB_WATCHER"].wait(name=job_name, namespace=namespace, timeout=wait_timeout)
+        response_data["completionStatus"] = job_status
+
+        pod_name = await get_job_pod_name(api, name=job_name, namespace=namespace)
+        if pod_name:
+            response_data["logs"] = await get_pod_logs(api, pod=pod_name, namespace=namespace)
+        else:
+            response_data["logWarning"] = "Job에 해당하는 Pod를 찾을 수 없어 로그를 가져올 수 없습니다."
+
+        schedule_job_publish(job_name, dict(job_metadata, status=job_status, updatedAt=datetime.utcnow().isoformat()))
+
+        if delete_after:
+            await delete_job(api, name=job_name, namespace=namespace)
+            app.logger.info(f"Job '{namespace}/{job_name}'이(가) 삭제되었습니다.")
+            response_data["deleted"] = True
+
+        return jsonify(response_data), 200
+
+    except TimeoutError as e:
+        app.logger.error(f"Job '{job_name}' 완료 대기 타임아웃: {e}")
+        response_data["completionStatus"] = "Timeout"
+        response_data["error"] = str(e)
+        return jsonify(response_data), 202
+    except Exception as e:
+        app.logger.error(f"Job '{job_name}' 완료/로그 처리 중 오류 발생: {e}")
+        response_data["completionStatus"] = "Error during completion check"
+        response_data["error"] = str(e)
+        return jsonify(response_data), 500
+
+
+# --- Job 로그 스트리밍 엔드포인트 (ASGI 모드 전용) ---
+@app.route('/api/v1/jobs/<namespace>/<job_name>/logs', methods=['GET'])
+async def job_logs(namespace, job_name):
+    """
+    Job Pod의 로그를 follow 모드로 chunked 응답으로 흘려보낸다.
+    """
+    api = app.config["KUBE_API"]
+    pod_name = await get_job_pod_name(api, name=job_name, namespace=namespace)
+    if not pod_name:
+        return jsonify({"error": f"Job '{namespace}/{job_name}'에 해당하는 Pod를 찾을 수 없습니다."}), 404
+
+    async def generate():
+        async for chunk in stream_pod_logs(api, pod=pod_name, namespace=namespace):
+            yield chunk
+
+    response = app.response_class(generate(), mimetype="text/plain")
+    # Quart는 기본적으로 RESPONSE_TIMEOUT(60초) 후 본문을 끊으므로 follow 스트림에는 제한을 두지 않는다.
+    response.timeout = None
+    return response
+
+
+if __name__ == '__main__':
+    # 개발 환경에서 실행 시. 프로덕션에서는 uvicorn asgi_app:app 사용.
+    import uvicorn
+
+    print("[ASGI API] ASGI 서버를 시작합니다. (개발 모드)")
+    uvicorn.run(app, host='0.0.0.0', port=5000)
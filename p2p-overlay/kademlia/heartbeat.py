@@ -0,0 +1,299 @@
+# 목적:
+# - 공급자(worker) 노드의 생존 여부와 여유 자원을 온체인 트랜잭션 없이 Kademlia DHT로 전파한다.
+#   (NodeRegistry.isAvailable은 registerNode 시점에 한 번만 기록되므로 실시간 상태를 담지 못함)
+# - 하트비트 레코드는 공급자의 이더리움 키로 서명하고 TTL을 가진다 (soft state: 갱신이 멈추면 자연히 만료).
+# - 요청자 측은 ProviderView로 공급자 주소 목록(NodeRegistry.getNodeList 등)에 대한 현재 상태를 조회한다.
+# - 공급자 키 하나는 한 호스트에서만 발행해야 한다 (여러 호스트가 같은 키로 서명하면 상태가 섞임).
+#   레코드에 발행 호스트(publisher)를 담고, 다른 호스트의 유효한 레코드가 보이면 publisher 값이 가장 작은
+#   호스트만 계속 발행하고 나머지는 그 레코드가 만료될 때까지 기다렸다가 다시 확인한다 (키를 옮긴 경우 자동 인계).
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+import time
+from typing import Callable, Dict, List, Optional
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+
+log = logging.getLogger('kademlia_node')
+
+HEARTBEAT_KEY_PREFIX = "mutual-cloud/heartbeat/"
+DEFAULT_INTERVAL_SECONDS = 5
+DEFAULT_TTL_SECONDS = 20
+# Kata 런타임이 샌드박스마다 디렉터리를 만드는 위치 (실행 중인 Job 수 추정에 사용)
+KATA_SANDBOX_DIR = "/run/vc/sbs"
+# 공급자와 요청자 간 시계 오차 허용치 (초)
+CLOCK_SKEW_SECONDS = 5
+
+
+def heartbeat_key(provider: str) -> str:
+    return HEARTBEAT_KEY_PREFIX + provider.lower()
+
+
+def _signing_payload(record: Dict) -> bytes:
+    body = {k: v for k, v in record.items() if k != "sig"}
+    return json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def sign_record(record: Dict, private_key: str) -> Dict:
+    """
+    레코드에 EIP-191 서명(sig)을 붙여 반환.
+    """
+    signed = Account.sign_message(encode_defunct(_signing_payload(record)), private_key=private_key)
+    return dict(record, sig=signed.signature.hex())
+
+
+def verify_record(record: Dict) -> bool:
+    """
+    서명자 주소가 레코드의 provider와 일치하는지 확인.
+    """
+    try:
+        signer = Account.recover_message(encode_defunct(_signing_payload(record)), signature=record["sig"])
+    except Exception:
+        return False
+    return signer.lower() == str(record.get("provider", "")).lower()
+
+
+def local_capacity() -> Dict[str, int]:
+    """
+    호스트의 여유 CPU(millicore)와 여유 RAM(MB)을 /proc에서 읽는다.
+    hostNetwork Pod에서도 /proc/loadavg, /proc/meminfo는 호스트 값을 보여준다.
+    """
+    cpus = os.cpu_count() or 1
+    try:
+        load1 = os.getloadavg()[0]
+    except OSError:
+        load1 = 0.0
+    free_cpu = max(0, int((cpus - load1) * 1000))
+
+    free_ram = 0
+    try:
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    free_ram = int(line.split()[1]) // 1024
+                    break
+    except OSError:
+        pass
+    return {"freeCpuMillis": free_cpu, "freeRamMb": free_ram}
+
+
+def count_running_jobs(sandbox_dir: str = KATA_SANDBOX_DIR) -> int:
+    """
+    실행 중인 Kata 샌드박스 수로 Job 수를 추정한다. 디렉터리가 없으면 0.
+    """
+    try:
+        return len(os.listdir(sandbox_dir))
+    except OSError:
+        return 0
+
+
+class HeartbeatConflict(RuntimeError):
+    """
+    같은 공급자 키로 우선순위가 높은(publisher 값이 작은) 다른 호스트가 하트비트를 발행 중일 때.
+    retry_at: 그 호스트의 레코드가 만료되는 시각.
+    """
+
+    def __init__(self, message: str, retry_at: float):
+        super().__init__(message)
+        self.retry_at = retry_at
+
+
+def is_expired(record: Dict, now: Optional[float] = None) -> bool:
+    """
+    issuedAt + ttl (+ 시계 오차 허용치)이 지난 레코드인지.
+    """
+    return record["issuedAt"] + record["ttl"] + CLOCK_SKEW_SECONDS < (now or time.time())
+
+
+class HeartbeatPublisher:
+    """
+    일정 주기로 서명된 하트비트 레코드를 DHT에 저장하는 공급자 측 루프.
+    publisher_id는 재시작해도 바뀌지 않는 호스트 식별자여야 한다 (기본값: NODE_NAME 또는 hostname).
+    """
+
+    def __init__(
+        self,
+        server,
+        private_key: str,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        capacity_fn: Callable[[], Dict[str, int]] = local_capacity,
+        running_jobs_fn: Callable[[], int] = count_running_jobs,
+        publisher_id: Optional[str] = None,
+    ):
+        if not private_key.startswith("0x"):
+            private_key = "0x" + private_key
+        self.server = server
+        self.private_key = private_key
+        self.provider = Account.from_key(private_key).address
+        self.interval = interval
+        self.ttl = ttl
+        self.capacity_fn = capacity_fn
+        self.running_jobs_fn = running_jobs_fn
+        self.publisher_id = publisher_id or os.getenv("NODE_NAME") or socket.gethostname()
+        # 재시작 후에도 이전 레코드보다 커지도록 시각 기반으로 시작
+        self.seq = int(time.time() * 1000)
+
+    def build_record(self) -> Dict:
+        self.seq += 1
+        record = {
+            "provider": self.provider,
+            "publisher": self.publisher_id,
+            "seq": self.seq,
+            "issuedAt": time.time(),
+            "ttl": self.ttl,
+            "runningJobs": self.running_jobs_fn(),
+        }
+        record.update(self.capacity_fn())
+        return sign_record(record, self.private_key)
+
+    async def check_conflict(self) -> None:
+        """
+        DHT에 다른 호스트가 같은 키로 발행한 유효한 레코드가 있을 때, 그 호스트의 publisher 값이 더 작으면
+        HeartbeatConflict (양보). 더 크면 경고만 남기고 계속 발행한다 (상대가 다음 확인에서 양보).
+        """
+        raw = await self.server.get(heartbeat_key(self.provider))
+        if not raw:
+            return
+        try:
+            current = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if not verify_record(current) or is_expired(current):
+            return
+        other = str(current.get("publisher", ""))
+        if other == self.publisher_id:
+            return
+        if other < self.publisher_id:
+            raise HeartbeatConflict(
+                f"공급자 {self.provider}의 하트비트를 다른 호스트({other})가 발행 중입니다. "
+                f"공급자 키는 호스트마다 달라야 합니다.",
+                retry_at=current["issuedAt"] + current["ttl"] + CLOCK_SKEW_SECONDS,
+            )
+        log.warning(f"공급자 {self.provider}의 하트비트를 다른 호스트({other})도 발행 중입니다. 이 호스트가 우선합니다.")
+
+    async def publish_once(self) -> bool:
+        await self.check_conflict()
+        record = self.build_record()
+        return await self.server.set(heartbeat_key(self.provider), json.dumps(record))
+
+    async def run(self) -> None:
+        log.info(
+            f"하트비트 발행 시작: provider={self.provider}, publisher={self.publisher_id}, "
+            f"주기={self.interval}s, TTL={self.ttl}s"
+        )
+        while True:
+            try:
+                if not await self.publish_once():
+                    log.warning("하트비트를 저장할 이웃 노드가 없습니다. 다음 주기에 재시도합니다.")
+            except HeartbeatConflict as e:
+                # 상대 레코드가 만료될 때까지 기다린 뒤 다시 확인 (상대 시계가 앞서 있어도 TTL+허용치 이상은 기다리지 않음)
+                delay = min(max(self.interval, e.retry_at - time.time()), self.ttl + CLOCK_SKEW_SECONDS)
+                log.error(f"{e} {delay:.1f}초 뒤 다시 확인합니다.")
+                await asyncio.sleep(delay)
+                continue
+            except Exception as e:
+                log.error(f"하트비트 발행 실패: {e}")
+            await asyncio.sleep(self.interval)
+
+
+class ProviderView:
+    """
+    요청자 측 공급자 상태 뷰 + 실패 감지기.
+    - 레코드 나이는 issuedAt 기준으로 계산하되, 공급자 시계가 앞서 있어도 CLOCK_SKEW_SECONDS 이상
+      젊게 보이지 않도록 min(받은 시각, issuedAt + 허용치)를 마지막 갱신 시각으로 쓴다.
+      (받은 시각만 쓰면 DHT에 남아 있던 오래된 레코드도 처음 조회될 때 live로 보임)
+    - 마지막 갱신 후 TTL의 절반이 지나면 suspect, TTL이 지나면 stale.
+    """
+
+    def __init__(self, server, max_concurrency: int = 32):
+        self.server = server
+        self.max_concurrency = max_concurrency
+        self._records: Dict[str, Dict] = {}
+        self._last_seen: Dict[str, float] = {}
+
+    async def _fetch(self, provider: str, sem: asyncio.Semaphore) -> Optional[Dict]:
+        async with sem:
+            try:
+                raw = await self.server.get(heartbeat_key(provider))
+            except Exception as e:
+                log.debug(f"하트비트 조회 실패 ({provider}): {e}")
+                return None
+        if not raw:
+            return None
+        try:
+            record = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        if str(record.get("provider", "")).lower() != provider.lower() or not verify_record(record):
+            log.warning(f"서명이 올바르지 않은 하트비트를 무시합니다: {provider}")
+            return None
+        return record
+
+    async def refresh(self, providers: List[str]) -> None:
+        """
+        주어진 공급자들의 하트비트를 DHT에서 병렬로 조회해 뷰를 갱신한다.
+        """
+        sem = asyncio.Semaphore(self.max_concurrency)
+        records = await asyncio.gather(*(self._fetch(p, sem) for p in providers))
+        now = time.time()
+        for provider, record in zip(providers, records):
+            if record is None:
+                continue
+            if is_expired(record, now):
+                continue  # 이미 만료된 레코드 (DHT에 남아 있던 이전 값)
+            key = provider.lower()
+            prev = self._records.get(key)
+            if prev is None or record["seq"] > prev["seq"]:
+                self._records[key] = record
+                self._last_seen[key] = min(now, record["issuedAt"] + CLOCK_SKEW_SECONDS)
+
+    def status(self, provider: str, now: Optional[float] = None) -> str:
+        """
+        'live', 'suspect', 'stale', 'unknown' 중 하나.
+        """
+        key = provider.lower()
+        record = self._records.get(key)
+        if record is None:
+            return "unknown"
+        age = (now or time.time()) - self._last_seen[key]
+        if age > record["ttl"]:
+            return "stale"
+        # 주기 정보가 레코드에 없으므로 TTL의 절반을 suspect 기준으로 사용 (기본 TTL = 4주기)
+        if age > record["ttl"] / 2:
+            return "suspect"
+        return "live"
+
+    def live_providers(self, min_cpu_millis: int = 0, min_ram_mb: int = 0) -> List[Dict]:
+        """
+        현재 live 상태이며 요구 자원을 만족하는 공급자 레코드 목록 (여유 CPU 내림차순).
+        네트워크 호출 없이 마지막 refresh 결과만 사용한다.
+        """
+        now = time.time()
+        out = [
+            r for key, r in self._records.items()
+            if self.status(key, now) == "live"
+            and r.get("freeCpuMillis", 0) >= min_cpu_millis
+            and r.get("freeRamMb", 0) >= min_ram_mb
+        ]
+        return sorted(out, key=lambda r: r.get("freeCpuMillis", 0), reverse=True)
+
+    async def watch(self, providers_fn: Callable, interval: float = DEFAULT_INTERVAL_SECONDS) -> None:
+        """
+        providers_fn()이 돌려주는 공급자 목록으로 주기적으로 refresh 한다.
+        providers_fn은 목록 또는 목록을 돌려주는 awaitable(예: run_in_executor로 감싼 NodeRegistry 조회)을 반환할 수 있다.
+        """
+        while True:
+            try:
+                providers = providers_fn()
+                if inspect.isawaitable(providers):
+                    providers = await providers
+                await self.refresh(providers)
+            except Exception as e:
+                log.error(f"공급자 뷰 갱신 실패: {e}")
+            await asyncio.sleep(interval)
@@ -1,9 +1,11 @@
 import asyncio
+import signal
 import sys
 import logging
 import os
 import json
 import yaml
+from datetime import datetime
 from typing import Optional, List, Tuple
 
 from kademlia.network import Server
@@ -11,6 +13,14 @@ from kademlia.utils import digest
 from routing import KademliaRoutingTable # 사용자 정의 라우팅 테이블 클래스 (여기서는 placeholder)
 from protocol import KademliaProtocol # 사용자 정의 프로토콜 클래스 (여기서는 placeholder)
 from storage import KademliaStorage # 사용자 정의 스토리지 클래스 (여기서는 placeholder)
+from heartbeat import HeartbeatPublisher, DEFAULT_INTERVAL_SECONDS, DEFAULT_TTL_SECONDS
+from peer_cache import (
+    PeerCache,
+    merge_bootstrap_nodes,
+    DEFAULT_CACHE_PATH,
+    DEFAULT_SAVE_INTERVAL_SECONDS,
+    DEFAULT_MAX_BOOTSTRAP_PEERS,
+)
 
 # 로깅 설정
 handler = logging.StreamHandler(sys.stdout)
@@ -36,15 +46,39 @@ async def run_kademlia_node(
     listen_port: int, 
     bootstrap_nodes: Optional[List[Tuple[str, int]]]=None,
     node_id_strategy: str = "random",
-    yggdrasil_public_key: Optional[str] = None
+    yggdrasil_public_key: Optional[str] = None,
+    provider_private_key: Optional[str] = None,
+    heartbeat_interval: float = DEFAULT_INTERVAL_SECONDS,
+    heartbeat_ttl: float = DEFAULT_TTL_SECONDS,
+    peer_cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+    peer_cache_interval: float = DEFAULT_SAVE_INTERVAL_SECONDS,
+    max_cached_bootstrap: int = DEFAULT_MAX_BOOTSTRAP_PEERS,
 ):
     """
     Kademlia 노드를 시작하고 P2P 네트워크에 연결합니다.
+    provider_private_key가 주어지면 공급자 하트비트(heartbeat.py)를 주기적으로 DHT에 발행합니다.
+    peer_cache_path가 주어지면 라우팅 테이블 연락처를 저장하고, 재시작 시 캐시 피어로 함께 부트스트랩합니다.
     """
+    # SIGTERM(Pod 종료)을 받으면 메인 작업을 취소해 finally의 종료 처리(피어 캐시 저장 등)가 실행되게 한다.
+    main_task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+    except (NotImplementedError, RuntimeError):
+        log.warning("SIGTERM 핸들러를 등록할 수 없습니다. 종료 시 피어 캐시가 저장되지 않을 수 있습니다.")
+
+    peer_cache = None
+    if peer_cache_path:
+        peer_cache = PeerCache(peer_cache_path, max_bootstrap_peers=max_cached_bootstrap)
+        peer_cache.load()
+
     node_id = None
     if node_id_strategy == "from_public_key" and yggdrasil_public_key:
         node_id = digest(yggdrasil_public_key.encode('utf-8')) # PublicKey로 ID 생성
         log.info(f"Yggdrasil PublicKey로 Kademlia 노드 ID를 생성했습니다: {node_id.hex()}")
+    elif peer_cache and peer_cache.meta.get("nodeId"):
+        # 이전 실행의 ID를 재사용해야 다른 노드 라우팅 테이블의 항목이 계속 유효하다.
+        node_id = bytes.fromhex(peer_cache.meta["nodeId"])
+        log.info(f"피어 캐시에 저장된 Kademlia 노드 ID를 재사용합니다: {node_id.hex()}")
     else:
         log.info("랜덤 Kademlia 노드 ID를 생성합니다.")
 
@@ -61,46 +95,75 @@ async def run_kademlia_node(
         log.error(f"Kademlia 노드 리스닝 실패 (주소 사용 중 또는 권한 문제): {e}")
         sys.exit(1)
 
-    if bootstrap_nodes:
-        log.info(f"부트스트랩 노드 {bootstrap_nodes}를 통해 Kademlia 네트워크에 조인 시도 중...")
-        try:
-            await server.bootstrap(bootstrap_nodes)
-            log.info(f"Kademlia 노드가 성공적으로 부트스트랩되었습니다.")
-        except Exception as e:
-            log.error(f"Kademlia 부트스트랩 실패: {e}. 단독 모드로 계속 실행합니다.")
-    else:
-        log.info("부트스트랩 노드가 지정되지 않았습니다. 이 노드가 네트워크의 첫 노드가 될 수 있습니다.")
+    cache_task = None
+    rejoin_task = None
+    heartbeat_task = None
+    # 리스닝 이후 어느 시점(부트스트랩, 테스트 set/get 포함)에 SIGTERM을 받아도 아래 finally에서 캐시를 저장한다.
+    try:
+        if peer_cache:
+            peer_cache.meta["nodeId"] = server.node.id.hex()
+            # 캐시 피어(RTT/최근 응답 순)를 시드보다 앞에 두고 한 번에 병렬 부트스트랩
+            bootstrap_nodes = merge_bootstrap_nodes(peer_cache.bootstrap_candidates(), bootstrap_nodes)
 
-    # 노드가 계속 실행되도록 유지하며, 필요에 따라 DHT 작업 수행
-    log.info("Kademlia 노드가 백그라운드에서 실행 중입니다. 데이터 저장/조회 준비 완료.")
-    
-    # --- 테스트 데이터 저장 및 조회 예시 (옵션) ---
-    # 실제 사용 시에는 이 부분을 외부 API 호출 등으로 대체합니다.
-    # 예: "job_id": "job_status"
-    test_key = "mutual-cloud-job-example-1"
-    test_value = json.dumps({
-        "status": "pending", 
-        "requester_id": "client-abc",
-        "timestamp": datetime.now().isoformat()
-    })
-    await server.set(test_key, test_value)
-    log.info(f"테스트 데이터 '{test_key}' = '{test_value}'를 DHT에 저장했습니다.")
-
-    await asyncio.sleep(5) # 데이터 전파를 위해 잠시 대기
-
-    retrieved_value = await server.get(test_key)
-    if retrieved_value:
-        log.info(f"테스트 데이터 '{test_key}' 조회 결과: '{retrieved_value}'")
-    else:
-        log.warning(f"테스트 데이터 '{test_key}'를 DHT에서 찾을 수 없습니다.")
+        if bootstrap_nodes:
+            log.info(f"부트스트랩 노드 {bootstrap_nodes}를 통해 Kademlia 네트워크에 조인 시도 중...")
+            if peer_cache:
+                # 부트스트랩 시작 시점부터 라우팅 테이블이 이전 크기까지 차는 시간을 백그라운드에서 측정
+                rejoin_task = asyncio.ensure_future(peer_cache.report_rejoin(server))
+            try:
+                await server.bootstrap(bootstrap_nodes)
+                log.info(f"Kademlia 노드가 성공적으로 부트스트랩되었습니다.")
+            except Exception as e:
+                log.error(f"Kademlia 부트스트랩 실패: {e}. 단독 모드로 계속 실행합니다.")
+        else:
+            log.info("부트스트랩 노드가 지정되지 않았습니다. 이 노드가 네트워크의 첫 노드가 될 수 있습니다.")
 
-    # 노드가 종료되지 않고 계속 P2P 네트워크에서 활동하도록 유지
-    try:
+        if peer_cache:
+            cache_task = asyncio.ensure_future(peer_cache.run(server, interval=peer_cache_interval))
+
+        if provider_private_key:
+            publisher = HeartbeatPublisher(
+                server,
+                provider_private_key,
+                interval=heartbeat_interval,
+                ttl=heartbeat_ttl,
+            )
+            heartbeat_task = asyncio.ensure_future(publisher.run())
+
+        # 노드가 계속 실행되도록 유지하며, 필요에 따라 DHT 작업 수행
+        log.info("Kademlia 노드가 백그라운드에서 실행 중입니다. 데이터 저장/조회 준비 완료.")
+
+        # --- 테스트 데이터 저장 및 조회 예시 (옵션) ---
+        # 실제 사용 시에는 이 부분을 외부 API 호출 등으로 대체합니다.
+        # 예: "job_id": "job_status"
+        test_key = "mutual-cloud-job-example-1"
+        test_value = json.dumps({
+            "status": "pending", 
+            "requester_id": "client-abc",
+            "timestamp": datetime.now().isoformat()
+        })
+        await server.set(test_key, test_value)
+        log.info(f"테스트 데이터 '{test_key}' = '{test_value}'를 DHT에 저장했습니다.")
+
+        await asyncio.sleep(5) # 데이터 전파를 위해 잠시 대기
+
+        retrieved_value = await server.get(test_key)
+        if retrieved_value:
+            log.info(f"테스트 데이터 '{test_key}' 조회 결과: '{retrieved_value}'")
+        else:
+            log.warning(f"테스트 데이터 '{test_key}'를 DHT에서 찾을 수 없습니다.")
+
+        # 노드가 종료되지 않고 계속 P2P 네트워크에서 활동하도록 유지
         while True:
             await asyncio.sleep(3600) # 1시간마다 유지 (네트워크 유지 활동은 라이브러리가 알아서 함)
     except asyncio.CancelledError:
         log.info("Kademlia 노드 실행이 취소되었습니다.")
     finally:
+        for task in (heartbeat_task, rejoin_task, cache_task):
+            if task:
+                task.cancel()
+        if peer_cache:
+            await peer_cache.save_on_shutdown(server)
         server.stop()
         log.info("Kademlia 노드가 종료되었습니다.")
 
@@ -112,6 +175,22 @@ if __name__ == '__main__':
     LISTEN_PORT = int(os.getenv("KADEMLIA_LISTEN_PORT", config_data.get("listen_port", 8468)))
     NODE_ID_STRATEGY = os.getenv("KADEMLIA_NODE_ID_STRATEGY", config_data.get("node_id_strategy", "random"))
     YGGDRASIL_PUBLIC_KEY = os.getenv("YGGDRASIL_PUBLIC_KEY") # Yggdrasil 설치 후 얻은 공개키
+    # 공급자 노드일 때만 설정 (NodeRegistry에 등록한 계정의 개인키, 하트비트 서명용)
+    # 키는 호스트마다 달라야 하므로 DaemonSet에서는 호스트의 키 파일(PROVIDER_PRIVATE_KEY_FILE)을 읽는다.
+    PROVIDER_PRIVATE_KEY = os.getenv("PROVIDER_PRIVATE_KEY")
+    PROVIDER_PRIVATE_KEY_FILE = os.getenv("PROVIDER_PRIVATE_KEY_FILE")
+    if not PROVIDER_PRIVATE_KEY and PROVIDER_PRIVATE_KEY_FILE:
+        try:
+            with open(PROVIDER_PRIVATE_KEY_FILE, "r", encoding="utf-8") as f:
+                PROVIDER_PRIVATE_KEY = f.read().strip() or None
+        except OSError as e:
+            log.error(f"공급자 키 파일 '{PROVIDER_PRIVATE_KEY_FILE}'을(를) 읽을 수 없습니다: {e}. 하트비트를 발행하지 않습니다.")
+    HEARTBEAT_INTERVAL = float(os.getenv("KADEMLIA_HEARTBEAT_INTERVAL", config_data.get("heartbeat_interval_seconds", DEFAULT_INTERVAL_SECONDS)))
+    HEARTBEAT_TTL = float(os.getenv("KADEMLIA_HEARTBEAT_TTL", config_data.get("heartbeat_ttl_seconds", DEFAULT_TTL_SECONDS)))
+    # 피어 캐시 경로 (빈 문자열이면 비활성화)
+    PEER_CACHE_PATH = os.getenv("KADEMLIA_PEER_CACHE_PATH", config_data.get("peer_cache_path", DEFAULT_CACHE_PATH)) or None
+    PEER_CACHE_INTERVAL = float(os.getenv("KADEMLIA_PEER_CACHE_INTERVAL", config_data.get("peer_cache_interval_seconds", DEFAULT_SAVE_INTERVAL_SECONDS)))
+    MAX_CACHED_BOOTSTRAP = int(os.getenv("KADEMLIA_MAX_CACHED_BOOTSTRAP", config_data.get("max_cached_bootstrap_peers", DEFAULT_MAX_BOOTSTRAP_PEERS)))
 
     # 부트스트랩 노드 목록 (환경 변수가 우선, JSON 형식 문자열)
     bootstrap_nodes_str = os.getenv("KADEMLIA_BOOTSTRAP_NODES", json.dumps(config_data.get("bootstrap_nodes", [])))
@@ -140,7 +219,14 @@ if __name__ == '__main__':
             LISTEN_PORT, 
             BOOTSTRAP_NODES, 
             NODE_ID_STRATEGY, 
-            YGGDRASIL_PUBLIC_KEY
+            YGGDRASIL_PUBLIC_KEY,
+            PROVIDER_PRIVATE_KEY,
+            HEARTBEAT_INTERVAL,
+            HEARTBEAT_TTL,
+            PEER_CACHE_PATH,
+            PEER_CACHE_INTERVAL,
+            MAX_CACHED_BOOTSTRAP,
         ))
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # 시작 도중(부트스트랩 등) SIGTERM을 받으면 취소 예외가 여기까지 올라온다.
         log.info("사용자 요청으로 Kademlia 노드를 종료합니다.")
\ No newline at end of file
@@ -0,0 +1,200 @@
+# 목적:
+# - 재시작 후 빠르게 Kademlia 네트워크에 다시 합류하기 위해 라우팅 테이블 연락처를 파일로 저장한다.
+#   (KADEMLIA_BOOTSTRAP_NODES 기본값이 []라서 재시작 시 단독으로 시작하거나 라우팅 테이블을 처음부터 다시 채워야 함)
+# - 주기적으로 연락처에 ping을 보내 last-seen 시각과 RTT를 갱신해 함께 저장한다.
+# - 시작 시 RTT가 낮고 최근에 응답한 캐시 피어 + 설정된 시드로 병렬 부트스트랩한다.
+# - 재시작 후 라우팅 테이블이 이전 크기까지 차는 데 걸린 시간을 측정해 로그와 캐시 파일에 남긴다.
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+log = logging.getLogger('kademlia_node')
+
+DEFAULT_CACHE_PATH = "/var/lib/kademlia/peers.json"
+DEFAULT_SAVE_INTERVAL_SECONDS = 60
+DEFAULT_MAX_BOOTSTRAP_PEERS = 8
+# 이보다 오래 응답이 없던 캐시 피어는 부트스트랩 후보에서 제외
+DEFAULT_MAX_AGE_SECONDS = 24 * 3600
+# 종료(SIGTERM) 시 저장 전 probe에 쓸 최대 시간. 응답 없는 연락처마다 ping 타임아웃(5초)이 걸리므로
+# 제한하지 않으면 Kubernetes 기본 종료 유예(30초)를 넘겨 SIGKILL로 저장하지 못할 수 있다.
+DEFAULT_SHUTDOWN_PROBE_SECONDS = 5
+
+
+def routing_table_contacts(server) -> List:
+    """
+    kademlia Server의 라우팅 테이블에 있는 Node 목록.
+    """
+    contacts = []
+    for bucket in server.protocol.router.buckets:
+        contacts.extend(bucket.nodes.values())
+    return contacts
+
+
+class PeerCache:
+    """
+    라우팅 테이블 연락처를 {"ip:port": {id, ip, port, firstSeen, lastSeen, rttMs}} 형태로 보관/저장한다.
+    lastSeen은 마지막으로 ping에 응답한 시각이며, 한 번도 응답하지 않았으면 0이다.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_bootstrap_peers: int = DEFAULT_MAX_BOOTSTRAP_PEERS,
+        max_age: float = DEFAULT_MAX_AGE_SECONDS,
+    ):
+        self.path = path
+        self.max_bootstrap_peers = max_bootstrap_peers
+        self.max_age = max_age
+        self.peers: Dict[str, Dict] = {}
+        self.meta: Dict = {}
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            log.info(f"피어 캐시 '{self.path}'가 없습니다. 설정된 부트스트랩 노드만 사용합니다.")
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.peers = {f"{p['ip']}:{p['port']}": p for p in data.get("peers", [])}
+            self.meta = data.get("meta", {})
+            log.info(f"피어 캐시에서 {len(self.peers)}개 연락처를 불러왔습니다.")
+        except Exception as e:
+            log.error(f"피어 캐시 '{self.path}' 로드 실패: {e}. 캐시 없이 시작합니다.")
+
+    def save(self) -> None:
+        """
+        임시 파일에 쓴 뒤 교체하여 저장 도중 재시작되어도 파일이 깨지지 않게 한다.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"meta": self.meta, "peers": list(self.peers.values())}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def bootstrap_candidates(self, now: Optional[float] = None) -> List[Tuple[str, int]]:
+        """
+        최근 응답했고 RTT가 낮은 순서로 최대 max_bootstrap_peers개의 (ip, port).
+        """
+        now = now or time.time()
+        fresh = [p for p in self.peers.values() if now - p.get("lastSeen", 0) <= self.max_age]
+        fresh.sort(key=lambda p: (p.get("rttMs") is None, p.get("rttMs") or 0, -p.get("lastSeen", 0)))
+        return [(p["ip"], p["port"]) for p in fresh[:self.max_bootstrap_peers]]
+
+    async def probe(self, server, max_concurrency: int = 16) -> int:
+        """
+        현재 라우팅 테이블 연락처에 병렬로 ping을 보내 lastSeen/RTT를 갱신한다. 응답한 연락처 수 반환.
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def _ping(node):
+            async with sem:
+                started = time.monotonic()
+                try:
+                    ok, _ = await server.protocol.ping((node.ip, node.port), server.node.id)
+                except Exception:
+                    ok = False
+                return node, ok, (time.monotonic() - started) * 1000
+
+        results = await asyncio.gather(*(_ping(n) for n in routing_table_contacts(server)))
+        now = time.time()
+        alive = 0
+        for node, ok, rtt_ms in results:
+            key = f"{node.ip}:{node.port}"
+            entry = self.peers.setdefault(key, {"ip": node.ip, "port": node.port, "firstSeen": now, "lastSeen": 0})
+            entry["id"] = node.id.hex()
+            if ok:
+                entry["lastSeen"] = now
+                # 순간 값이 튀지 않도록 지수 이동 평균
+                prev = entry.get("rttMs")
+                entry["rttMs"] = round(rtt_ms if prev is None else 0.7 * prev + 0.3 * rtt_ms, 2)
+                alive += 1
+        # 오래된 항목 정리: 한 번도 응답하지 않은 항목은 처음 본 시각부터 max_age가 지나면 제거
+        self.peers = {
+            k: p for k, p in self.peers.items()
+            if now - max(p.get("lastSeen", 0), p.get("firstSeen", 0)) <= self.max_age
+        }
+        self.meta["routingTableSize"] = len(results)
+        self.meta["savedAt"] = now
+        return alive
+
+    async def report_rejoin(self, server, timeout: float = 120.0) -> Dict:
+        """
+        measure_rejoin 결과를 로그로 남기고 캐시 파일의 meta.lastRejoin에 기록한다.
+        """
+        rejoin = await measure_rejoin(server, target=self.meta.get("routingTableSize", 0), timeout=timeout)
+        self.meta["lastRejoin"] = rejoin
+        log.info(
+            f"라우팅 테이블 재구성: {rejoin['seconds']}초, 연락처 {rejoin['contacts']}/{rejoin['target']}"
+            f"{'' if rejoin['reached'] else ' (타임아웃)'}"
+        )
+        try:
+            self.save()
+        except Exception as e:
+            log.error(f"피어 캐시 저장 실패: {e}")
+        return rejoin
+
+    async def save_on_shutdown(self, server, probe_timeout: float = DEFAULT_SHUTDOWN_PROBE_SECONDS) -> None:
+        """
+        종료 직전 probe를 probe_timeout 안에서만 시도하고, 끝나지 않거나 실패해도 마지막으로 probe한 상태를 저장한다.
+        """
+        try:
+            await asyncio.wait_for(self.probe(server), timeout=probe_timeout)
+        except asyncio.TimeoutError:
+            log.warning(f"종료 시 피어 probe가 {probe_timeout}초 안에 끝나지 않아 마지막 상태를 저장합니다.")
+        except Exception as e:
+            log.error(f"종료 시 피어 probe 실패: {e}")
+        try:
+            self.save()
+        except Exception as e:
+            log.error(f"종료 시 피어 캐시 저장 실패: {e}")
+
+    async def run(self, server, interval: float = DEFAULT_SAVE_INTERVAL_SECONDS) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                alive = await self.probe(server)
+                self.save()
+                log.info(f"피어 캐시 저장: 연락처 {self.meta['routingTableSize']}개 중 {alive}개 응답")
+            except Exception as e:
+                log.error(f"피어 캐시 저장 실패: {e}")
+
+
+def merge_bootstrap_nodes(cached: List[Tuple[str, int]], seeds: Optional[List[Tuple[str, int]]]) -> List[Tuple[str, int]]:
+    """
+    캐시 피어를 앞에 두고 설정 시드를 중복 없이 합친다.
+    """
+    out = []
+    for addr in list(cached) + list(seeds or []):
+        addr = (addr[0], int(addr[1]))
+        if addr not in out:
+            out.append(addr)
+    return out
+
+
+async def measure_rejoin(server, target: int, timeout: float = 120.0, poll: float = 0.5) -> Dict:
+    """
+    라우팅 테이블 연락처 수가 target(이전 실행에서 저장된 크기)에 도달할 때까지 걸린 시간을 측정한다.
+    target이 없으면 연락처 수가 5초간 변하지 않을 때를 '가득 참'으로 본다.
+    """
+    started = time.monotonic()
+    last_count, stable_since = -1, started
+    while True:
+        count = len(routing_table_contacts(server))
+        now = time.monotonic()
+        if count != last_count:
+            last_count, stable_since = count, now
+        reached = count >= target if target else (count > 0 and now - stable_since >= 5)
+        if reached or now - started >= timeout:
+            elapsed = (stable_since if not target else now) - started
+            return {
+                "seconds": round(elapsed, 3),
+                "contacts": count,
+                "target": target,
+                "reached": bool(reached),
+                "measuredAt": time.time(),
+            }
+        await asyncio.sleep(poll)
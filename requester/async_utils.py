@@ -0,0 +1,200 @@
+# 목적:
+# - utils.py의 Kubernetes Job 헬퍼를 kubernetes_asyncio 기반 코루틴으로 제공한다.
+# - 하나의 이벤트 루프에서 수천 개의 Job 대기/로그 스트림을 스레드 없이 처리하기 위함.
+# - 매니페스트 생성(build_job_manifest)은 동기 버전을 그대로 재사용한다.
+
+import asyncio
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from kubernetes_asyncio import client, config, watch
+from kubernetes_asyncio.client import ApiClient, ApiException
+
+
+# 단일 ApiClient(aiohttp 커넥터)의 동시 연결 수. kubernetes_asyncio 기본값(100)은
+# 로그 스트림이 많을 때 요청이 커넥터 대기열에 쌓이므로 명시적으로 늘린다.
+DEFAULT_POOL_MAXSIZE = 1000
+# Job watch가 예외로 끝났을 때 다시 열기 전 대기 시간(초)
+WATCH_RETRY_SECONDS = 1
+
+
+async def load_kube(kubeconfig: Optional[str] = None, pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> ApiClient:
+    """
+    kubeconfig 경로로 클라이언트 로드 후 공유 ApiClient 반환. None이면 환경에서 자동 탐색.
+    반환된 ApiClient는 커넥션 풀을 가지므로 프로세스당 하나를 만들어 재사용하고, 종료 시 close() 한다.
+    """
+    configuration = client.Configuration()
+    if kubeconfig:
+        await config.load_kube_config(config_file=os.path.expanduser(kubeconfig), client_configuration=configuration)
+    else:
+        # 클러스터 내부 실행 시
+        try:
+            config.load_incluster_config(client_configuration=configuration)
+        except config.ConfigException:
+            # 로컬 환경 기본 경로 시도
+            await config.load_kube_config(client_configuration=configuration)
+    configuration.connection_pool_maxsize = pool_maxsize
+    return ApiClient(configuration=configuration)
+
+
+async def create_job_from_manifest(api: ApiClient, manifest: Dict) -> Dict:
+    """
+    Job 리소스 생성.
+    """
+    batch = client.BatchV1Api(api)
+    ns = manifest["metadata"]["namespace"]
+    job = await batch.create_namespaced_job(namespace=ns, body=manifest)
+    return job.to_dict()
+
+
+def _job_state(job) -> Optional[str]:
+    for cond in (job.status and job.status.conditions) or []:
+        if cond.type == "Complete" and cond.status == "True":
+            return "Complete"
+        if cond.type == "Failed" and cond.status == "True":
+            return "Failed"
+    return None
+
+
+class JobWatcher:
+    """
+    네임스페이스마다 Job watch 하나만 열어 두고(informer 방식), 대기 중인 Job들의 Future를 완료시킨다.
+    대기 요청 수와 상관없이 API 서버에는 네임스페이스당 watch 연결 하나만 유지된다.
+    """
+
+    def __init__(self, api: ApiClient):
+        self.api = api
+        self._waiters: Dict[Tuple[str, str], List[asyncio.Future]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _ensure_watch(self, namespace: str) -> None:
+        task = self._tasks.get(namespace)
+        if task is None or task.done():
+            self._tasks[namespace] = asyncio.ensure_future(self._watch(namespace))
+
+    def _resolve(self, namespace: str, name: str, state: Optional[str] = None, error: Optional[Exception] = None) -> None:
+        for fut in self._waiters.pop((namespace, name), []):
+            if fut.done():
+                continue
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(state)
+
+    async def _watch(self, namespace: str) -> None:
+        batch = client.BatchV1Api(self.api)
+        while True:
+            try:
+                # timeout_seconds 없이 열면 Watch가 끊긴 연결과 410 Gone을 스스로 재연결한다.
+                # 그래도 예외로 끝나면 새 watch를 연다 (첫 ADDED 이벤트들로 현재 상태를 다시 받음).
+                async with watch.Watch().stream(batch.list_namespaced_job, namespace=namespace) as stream:
+                    async for event in stream:
+                        job = event["object"]
+                        name = job.metadata.name
+                        if (namespace, name) not in self._waiters:
+                            continue
+                        if event["type"] == "DELETED":
+                            self._resolve(namespace, name, error=RuntimeError(f"Job {namespace}/{name} not found"))
+                            continue
+                        state = _job_state(job)
+                        if state:
+                            self._resolve(namespace, name, state)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[async_utils] Job watch({namespace}) 재시작: {e}")
+                await asyncio.sleep(WATCH_RETRY_SECONDS)
+
+    async def wait(self, name: str, namespace: str, timeout: int = 600) -> str:
+        """
+        Job 완료(Complete/Failed)까지 대기. 상태 문자열 반환.
+        """
+        fut = asyncio.get_running_loop().create_future()
+        key = (namespace, name)
+        self._waiters.setdefault(key, []).append(fut)
+        self._ensure_watch(namespace)
+        try:
+            # watch 등록 전에 이미 끝난 Job을 놓치지 않도록 현재 상태를 한 번 확인
+            try:
+                job = await client.BatchV1Api(self.api).read_namespaced_job(name=name, namespace=namespace)
+            except ApiException as e:
+                if e.status == 404:
+                    raise RuntimeError(f"Job {namespace}/{name} not found")
+                raise
+            state = _job_state(job)
+            if state:
+                return state
+            return await asyncio.wait_for(asyncio.shield(fut), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Job {namespace}/{name} wait timeout ({timeout}s)")
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters and fut in waiters:
+                waiters.remove(fut)
+                if not waiters:
+                    del self._waiters[key]
+
+    async def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+
+async def get_job_pod_name(api: ApiClient, name: str, namespace: str) -> Optional[str]:
+    """
+    Job이 생성한 Pod 이름을 하나 반환.
+    """
+    core = client.CoreV1Api(api)
+    pods = await core.list_namespaced_pod(namespace=namespace, label_selector=f"job-name={name}")
+    if pods.items:
+        return pods.items[0].metadata.name
+    return None
+
+
+async def get_pod_logs(api: ApiClient, pod: str, namespace: str, container: Optional[str] = None) -> str:
+    """
+    Pod 로그를 문자열로 반환.
+    """
+    core = client.CoreV1Api(api)
+    return await core.read_namespaced_pod_log(
+        name=pod,
+        namespace=namespace,
+        container=container,
+        follow=False,
+        tail_lines=1000,
+    )
+
+
+async def stream_pod_logs(
+    api: ApiClient, pod: str, namespace: str, container: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """
+    Pod 로그를 follow 모드로 받아 도착하는 대로 bytes 청크를 내보낸다.
+    """
+    core = client.CoreV1Api(api)
+    resp = await core.read_namespaced_pod_log(
+        name=pod,
+        namespace=namespace,
+        container=container,
+        follow=True,
+        _preload_content=False,
+    )
+    try:
+        async for chunk in resp.content.iter_any():
+            yield chunk
+    finally:
+        resp.release()
+
+
+async def delete_job(api: ApiClient, name: str, namespace: str) -> None:
+    """
+    Job 및 하위 Pod 삭제.
+    """
+    batch = client.BatchV1Api(api)
+    propagation = client.V1DeleteOptions(propagation_policy="Foreground")
+    try:
+        await batch.delete_namespaced_job(name=name, namespace=namespace, body=propagation)
+    except ApiException as e:
+        if e.status != 404:
+            raise
@@ -0,0 +1,507 @@
+# 목적:
+# - Besu(chainId 2025)에 배포된 NodeRegistry / P2PComputeMarket 컨트랙트와 Python에서 통신한다.
+# - HTTP keep-alive 커넥션 풀과 JSON-RPC 배치 요청으로 조회 왕복 횟수를 줄인다.
+# - nonce를 로컬에서 관리하여 여러 트랜잭션을 receipt 대기 없이 연속으로 전송한다.
+# - receipt는 백그라운드 스레드가 배치로 폴링하여 Future로 돌려준다.
+#   (블록 주기 2초 동안 트랜잭션 하나씩만 처리되는 병목을 피하기 위함)
+
+import heapq
+import itertools
+from collections import deque
+import os
+import threading
+import time
+from concurrent.futures import Future, wait as wait_futures
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_utils import keccak, to_checksum_address
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+DEFAULT_CHAIN_ID = 2025
+# Besu --rpc-http-max-batch-size 기본값(1024). 이보다 큰 배치는 여러 HTTP 요청으로 나눠 보낸다.
+DEFAULT_MAX_BATCH = 1024
+
+# 함수 selector (blockchain/artifacts/build-info 의 methodIdentifiers 값)
+SEL_NODES = bytes.fromhex("189a5a17")               # nodes(address)
+SEL_GET_NODE_LIST = bytes.fromhex("53f3b713")       # getNodeList()
+SEL_REGISTER_NODE = bytes.fromhex("7a868e81")       # registerNode(string,uint256,uint256)
+SEL_JOBS = bytes.fromhex("38ed7cfc")                # jobs(bytes32)
+SEL_REQUEST_COMPUTATION = bytes.fromhex("5769e89a") # requestComputation(address)
+SEL_FINALIZE_JOB = bytes.fromhex("088c49d6")        # finalizeJob(bytes32,bool)
+
+TOPIC_RESOURCE_REQUESTED = "0x" + keccak(text="ResourceRequested(bytes32,address)").hex()
+
+
+class RpcError(RuntimeError):
+    """
+    JSON-RPC 응답의 error 필드를 감싼 예외.
+    """
+
+    def __init__(self, method: str, error: Dict):
+        self.method = method
+        self.code = error.get("code")
+        self.data = error.get("data")
+        super().__init__(f"{method} 실패 (code={self.code}): {error.get('message')}")
+
+
+class BesuRpcClient:
+    """
+    keep-alive 커넥션 풀을 재사용하는 JSON-RPC 클라이언트.
+    여러 스레드에서 동시에 호출해도 안전하다.
+    """
+
+    def __init__(
+        self,
+        url: str = DEFAULT_RPC_URL,
+        pool_size: int = 16,
+        timeout: float = 10.0,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self._ids = itertools.count(1)
+        self._id_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _next_id(self) -> int:
+        with self._id_lock:
+            return next(self._ids)
+
+    def _post(self, payload: Any) -> Any:
+        resp = self.session.post(self.url, json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def call(self, method: str, params: Optional[List] = None) -> Any:
+        """
+        단일 JSON-RPC 호출. result를 반환하고, error면 RpcError를 던진다.
+        """
+        body = self._post({"jsonrpc": "2.0", "id": self._next_id(), "method": method, "params": params or []})
+        if "error" in body:
+            raise RpcError(method, body["error"])
+        return body.get("result")
+
+    def batch(self, calls: Sequence[Tuple[str, List]], raise_on_error: bool = True) -> List[Any]:
+        """
+        여러 호출을 JSON-RPC batch로 보낸다. max_batch개씩 나눠 각각 하나의 HTTP 요청으로 보낸다.
+        결과는 calls와 같은 순서로 반환한다. raise_on_error=False면 실패 항목 자리에 RpcError 객체가 들어간다.
+        """
+        out = []
+        for start in range(0, len(calls), self.max_batch):
+            out.extend(self._batch_once(calls[start:start + self.max_batch], raise_on_error))
+        return out
+
+    def _batch_once(self, calls: Sequence[Tuple[str, List]], raise_on_error: bool) -> List[Any]:
+        ids = [self._next_id() for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in zip(ids, calls)
+        ]
+        body = self._post(payload)
+        if isinstance(body, dict):
+            # 배치 자체가 거부된 경우 (예: 노드의 배치 크기 제한 초과)
+            raise RpcError("batch", body.get("error", {"message": str(body)}))
+
+        by_id = {item.get("id"): item for item in body}
+        out = []
+        for i, (method, _) in zip(ids, calls):
+            item = by_id.get(i)
+            if item is None:
+                err = RpcError(method, {"message": "배치 응답에 해당 id가 없습니다."})
+            elif "error" in item:
+                err = RpcError(method, item["error"])
+            else:
+                out.append(item.get("result"))
+                continue
+            if raise_on_error:
+                raise err
+            out.append(err)
+        return out
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class NonceManager:
+    """
+    계정의 nonce를 로컬에서 증가시키며 발급한다.
+    체인에서는 최초 1회(또는 resync 시)만 pending nonce를 읽는다.
+    전송에 실패한 nonce는 release()로 반납되어 다음 reserve()에서 먼저 재사용된다 (nonce gap 방지).
+    """
+
+    def __init__(self, rpc: BesuRpcClient, address: str):
+        self.rpc = rpc
+        self.address = to_checksum_address(address)
+        self._lock = threading.Lock()
+        self._next: Optional[int] = None
+        self._free: List[int] = []  # 반납된 nonce (min-heap)
+
+    def _fetch(self) -> int:
+        return int(self.rpc.call("eth_getTransactionCount", [self.address, "pending"]), 16)
+
+    def reserve(self) -> int:
+        with self._lock:
+            if self._free:
+                return heapq.heappop(self._free)
+            if self._next is None:
+                self._next = self._fetch()
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def release(self, nonce: int) -> None:
+        """
+        전송되지 않은 nonce를 반납한다. 다른 스레드가 이미 받아간 nonce에는 영향을 주지 않는다.
+        """
+        with self._lock:
+            if self._next is not None and nonce < self._next and nonce not in self._free:
+                heapq.heappush(self._free, nonce)
+
+    def resync(self) -> None:
+        """
+        다른 프로세스가 같은 계정을 사용해 체인의 pending nonce가 앞서간 경우("nonce too low") 따라잡는다.
+        로컬 값을 되감지 않으므로 이미 발급된 nonce가 중복 발급되지 않는다.
+        """
+        chain_next = self._fetch()
+        with self._lock:
+            self._free = [n for n in self._free if n >= chain_next]
+            heapq.heapify(self._free)
+            if self._next is None or chain_next > self._next:
+                self._next = chain_next
+
+
+class ReceiptTracker:
+    """
+    전송된 트랜잭션의 receipt를 백그라운드 스레드에서 배치로 폴링한다.
+    track()은 receipt(dict)로 완료되는 Future를 반환한다.
+    """
+
+    def __init__(self, rpc: BesuRpcClient, poll_interval: float = 1.0, timeout: float = 120.0):
+        self.rpc = rpc
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._pending: Dict[str, Tuple[Future, float]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        # 조회 전용 클라이언트는 스레드가 필요 없으므로 첫 track() 때 시작한다.
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, tx_hash: str) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            self._pending[tx_hash] = (fut, time.time())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="receipt-tracker", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return fut
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                self._poll_once()
+            except Exception as e:
+                # 일시적인 RPC 장애는 다음 주기에 재시도한다.
+                print(f"[chain] receipt 폴링 중 오류 발생: {e}")
+            # 노드에 연결할 수 없어 폴링이 실패해도 타임아웃은 적용한다.
+            self._expire()
+
+    def _expire(self) -> None:
+        now = time.time()
+        with self._lock:
+            expired = [(h, fut) for h, (fut, started) in self._pending.items() if now - started > self.timeout]
+            for tx_hash, _ in expired:
+                del self._pending[tx_hash]
+        for tx_hash, fut in expired:
+            fut.set_exception(TimeoutError(f"트랜잭션 {tx_hash} receipt 대기 타임아웃 ({self.timeout}s)"))
+
+    def _poll_once(self) -> None:
+        with self._lock:
+            hashes = list(self._pending.keys())
+        results = self.rpc.batch([("eth_getTransactionReceipt", [h]) for h in hashes], raise_on_error=False)
+        for tx_hash, receipt in zip(hashes, results):
+            if receipt is None or isinstance(receipt, RpcError):
+                continue
+            with self._lock:
+                entry = self._pending.pop(tx_hash, None)
+            if entry is not None:
+                entry[0].set_result(receipt)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+
+class MarketClient:
+    """
+    NodeRegistry / P2PComputeMarket 호출을 묶은 고수준 클라이언트.
+    조회는 배치로, 트랜잭션은 nonce 파이프라이닝으로 처리한다.
+    """
+
+    def __init__(
+        self,
+        rpc: BesuRpcClient,
+        registry_address: Optional[str],
+        market_address: Optional[str],
+        private_key: Optional[str] = None,
+        chain_id: int = DEFAULT_CHAIN_ID,
+        gas_price: int = 0,
+        gas_limit: int = 300_000,
+        receipt_poll_interval: float = 1.0,
+        receipt_timeout: float = 120.0,
+    ):
+        self.rpc = rpc
+        self.registry = to_checksum_address(registry_address) if registry_address else None
+        self.market = to_checksum_address(market_address) if market_address else None
+        self.chain_id = chain_id
+        self.gas_price = gas_price
+        self.gas_limit = gas_limit
+        self.account = None
+        self.nonces = None
+        if private_key:
+            if not private_key.startswith("0x"):
+                private_key = "0x" + private_key
+            self.account = Account.from_key(private_key)
+            self.nonces = NonceManager(rpc, self.account.address)
+        self.receipts = ReceiptTracker(rpc, poll_interval=receipt_poll_interval, timeout=receipt_timeout)
+        # requestComputation 직렬화 상태 (request_computation 참고)
+        self._request_lock = threading.Lock()
+        self._last_request: Optional[Future] = None
+        # jobId 충돌은 인접한 블록의 요청끼리만 생기므로 최근 jobId 몇 개만 기억한다.
+        self._recent_job_ids = deque(maxlen=16)
+        self._job_ids_lock = threading.Lock()
+        # 전송 결과가 불확실했던(타임아웃 등) nonce가 있으면 다음 전송 전에 체인 값으로 맞춘다.
+        self._resync_before_send = threading.Event()
+
+    # --- 조회 (eth_call 배치) ---
+
+    def _call_params(self, to: str, data: bytes) -> List:
+        return [{"to": to, "data": "0x" + data.hex()}, "latest"]
+
+    def _require(self, address: Optional[str], name: str) -> str:
+        if not address:
+            raise ValueError(f"{name} 컨트랙트 주소가 설정되지 않았습니다.")
+        return address
+
+    def get_node_list(self) -> List[str]:
+        registry = self._require(self.registry, "NodeRegistry")
+        raw = self.rpc.call("eth_call", self._call_params(registry, SEL_GET_NODE_LIST))
+        (addrs,) = decode(["address[]"], bytes.fromhex(raw[2:]))
+        return [to_checksum_address(a) for a in addrs]
+
+    def get_nodes(self, addresses: Sequence[str]) -> List[Optional[Dict]]:
+        """
+        nodes(addr)를 한 번의 배치 요청으로 조회한다. 등록되지 않은 주소는 None.
+        """
+        registry = self._require(self.registry, "NodeRegistry")
+        calls = [
+            ("eth_call", self._call_params(registry, SEL_NODES + encode(["address"], [to_checksum_address(a)])))
+            for a in addresses
+        ]
+        out = []
+        for raw in self.rpc.batch(calls):
+            owner, location, cpu, ram, available = decode(
+                ["address", "string", "uint256", "uint256", "bool"], bytes.fromhex(raw[2:])
+            )
+            if int(owner, 16) == 0:
+                out.append(None)
+                continue
+            out.append({
+                "owner": to_checksum_address(owner),
+                "location": location,
+                "cpuUnits": cpu,
+                "ramMb": ram,
+                "isAvailable": available,
+            })
+        return out
+
+    def get_all_nodes(self) -> List[Dict]:
+        return [n for n in self.get_nodes(self.get_node_list()) if n]
+
+    def get_jobs(self, job_ids: Sequence[bytes]) -> List[Optional[Dict]]:
+        """
+        jobs(jobId)를 한 번의 배치 요청으로 조회한다. 존재하지 않는 Job은 None.
+        """
+        market = self._require(self.market, "P2PComputeMarket")
+        calls = [
+            ("eth_call", self._call_params(market, SEL_JOBS + encode(["bytes32"], [_to_bytes32(j)])))
+            for j in job_ids
+        ]
+        out = []
+        for raw in self.rpc.batch(calls):
+            job_id, requester, provider, status = decode(
+                ["bytes32", "address", "address", "string"], bytes.fromhex(raw[2:])
+            )
+            if int(requester, 16) == 0:
+                out.append(None)
+                continue
+            out.append({
+                "jobId": "0x" + job_id.hex(),
+                "requester": to_checksum_address(requester),
+                "provider": to_checksum_address(provider),
+                "status": status,
+            })
+        return out
+
+    # --- 트랜잭션 (nonce 파이프라이닝) ---
+
+    def _send(self, to: str, data: bytes, gas_limit: Optional[int] = None) -> Tuple[str, Future]:
+        if not self.account:
+            raise ValueError("트랜잭션 전송에는 private_key가 필요합니다.")
+        if self._resync_before_send.is_set():
+            self._resync_before_send.clear()
+            try:
+                self.nonces.resync()
+            except Exception:
+                self._resync_before_send.set()
+                raise
+        nonce = self.nonces.reserve()
+        # Besu 레거시 트랜잭션 (deploy.js의 type: 0과 동일).
+        # eth_account는 type 필드 없이 gasPrice만 있으면 레거시로 서명한다 (type=0을 넣으면 TypeError).
+        tx = {
+            "nonce": nonce,
+            "to": to,
+            "value": 0,
+            "data": "0x" + data.hex(),
+            "gas": gas_limit or self.gas_limit,
+            "gasPrice": self.gas_price,
+            "chainId": self.chain_id,
+        }
+        signed = self.account.sign_transaction(tx)
+        raw_tx = getattr(signed, "raw_transaction", None) or signed.rawTransaction
+        try:
+            tx_hash = self.rpc.call("eth_sendRawTransaction", ["0x" + bytes(raw_tx).hex()])
+        except RpcError as e:
+            if "nonce too low" in str(e).lower():
+                # 다른 프로세스가 이 nonce를 이미 사용함. 이 nonce는 버리고 체인 값으로 따라잡는다.
+                self.nonces.resync()
+            else:
+                # 노드가 명시적으로 거부한 트랜잭션이므로 nonce를 반납해 재사용한다.
+                self.nonces.release(nonce)
+            raise
+        except Exception:
+            # 타임아웃/연결 오류는 노드가 이미 트랜잭션을 받았을 수 있으므로 nonce를 반납하지 않는다
+            # (반납하면 같은 nonce의 다른 트랜잭션이 "replacement underpriced"로 실패한다).
+            # 받지 못한 경우의 gap은 다음 전송 전 resync로 정리한다.
+            self._resync_before_send.set()
+            raise
+        return tx_hash, self.receipts.track(tx_hash)
+
+    def register_node(self, location: str, cpu_units: int, ram_mb: int) -> Tuple[str, Future]:
+        registry = self._require(self.registry, "NodeRegistry")
+        data = SEL_REGISTER_NODE + encode(["string", "uint256", "uint256"], [location, cpu_units, ram_mb])
+        return self._send(registry, data)
+
+    def request_computation(self, provider: str) -> Tuple[str, Future]:
+        """
+        requestComputation(provider) 전송 후 (txHash, Future)를 반환한다.
+        생성된 jobId는 receipt에서 job_id_from_receipt()로 꺼낸다.
+
+        주의: 컨트랙트가 jobId를 keccak256(msg.sender, block.timestamp)로 만들기 때문에
+        같은 계정의 requestComputation 두 건이 같은 블록에 들어가면 jobId가 같아지고 뒤의 것이
+        jobs[jobId]를 조용히 덮어쓴다. 컨트랙트가 계정별 카운터 등으로 jobId를 고유하게 만들기 전까지는
+        이 메서드를 블록당 한 건으로 직렬화한다 (이전 요청의 receipt가 나온 뒤에 전송).
+        finalizeJob 등 다른 트랜잭션은 계속 파이프라이닝된다.
+        그래도 중복 jobId가 관측되면 Future가 RuntimeError로 실패한다.
+        """
+        market = self._require(self.market, "P2PComputeMarket")
+        data = SEL_REQUEST_COMPUTATION + encode(["address"], [to_checksum_address(provider)])
+        with self._request_lock:
+            if self._last_request is not None:
+                wait_futures([self._last_request])
+            tx_hash, receipt_future = self._send(market, data)
+            self._last_request = receipt_future
+
+        out: Future = Future()
+
+        def _check_duplicate(f: Future) -> None:
+            if f.exception() is not None:
+                out.set_exception(f.exception())
+                return
+            receipt = f.result()
+            job_id = job_id_from_receipt(receipt)
+            if job_id is not None:
+                with self._job_ids_lock:
+                    duplicate = job_id in self._recent_job_ids
+                    self._recent_job_ids.append(job_id)
+                if duplicate:
+                    out.set_exception(RuntimeError(
+                        f"중복 jobId {job_id} (tx {tx_hash}): 같은 블록의 이전 요청을 덮어썼습니다."
+                    ))
+                    return
+            out.set_result(receipt)
+
+        receipt_future.add_done_callback(_check_duplicate)
+        return tx_hash, out
+
+    def finalize_job(self, job_id: bytes, was_successful: bool) -> Tuple[str, Future]:
+        market = self._require(self.market, "P2PComputeMarket")
+        data = SEL_FINALIZE_JOB + encode(["bytes32", "bool"], [_to_bytes32(job_id), was_successful])
+        return self._send(market, data)
+
+    def close(self) -> None:
+        self.receipts.stop()
+        self.rpc.close()
+
+
+def _to_bytes32(value) -> bytes:
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    if len(value) != 32:
+        raise ValueError(f"bytes32 값이 아닙니다: {value!r}")
+    return value
+
+
+def job_id_from_receipt(receipt: Dict) -> Optional[str]:
+    """
+    requestComputation receipt의 ResourceRequested 이벤트에서 jobId를 꺼낸다.
+    """
+    if int(receipt.get("status", "0x0"), 16) != 1:
+        return None
+    for entry in receipt.get("logs", []):
+        topics = entry.get("topics", [])
+        if topics and topics[0] == TOPIC_RESOURCE_REQUESTED:
+            return topics[1]
+    return None
+
+
+def market_client_from_config(cfg: Dict) -> MarketClient:
+    """
+    config.yaml의 besu 섹션으로 MarketClient 생성.
+    private_key는 환경 변수(PRIVATE_KEY)가 우선한다 (hardhat.config.js와 동일).
+    """
+    besu = cfg.get("besu") or {}
+    rpc = BesuRpcClient(
+        url=os.getenv("BESU_RPC") or besu.get("rpc_url", DEFAULT_RPC_URL),
+        pool_size=besu.get("pool_size", 16),
+        timeout=besu.get("rpc_timeout_seconds", 10.0),
+        max_batch=besu.get("max_batch_size", DEFAULT_MAX_BATCH),
+    )
+    return MarketClient(
+        rpc,
+        registry_address=besu.get("node_registry_address"),
+        market_address=besu.get("market_address"),
+        private_key=os.getenv("PRIVATE_KEY") or besu.get("private_key"),
+        chain_id=besu.get("chain_id", DEFAULT_CHAIN_ID),
+        gas_price=besu.get("gas_price", 0),
+        gas_limit=besu.get("gas_limit", 300_000),
+        receipt_poll_interval=besu.get("receipt_poll_interval_seconds", 1.0),
+        receipt_timeout=besu.get("receipt_timeout_seconds", 120.0),
+    )
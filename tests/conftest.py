@@ -0,0 +1,15 @@
+# 각 컴포넌트가 자기 디렉터리 기준의 평면 import(from heartbeat import ...)를 쓰므로 테스트에서도 경로를 추가한다.
+# requester/는 경로에 넣지 않는다: requester/requester.py가 asgi_app.py의 `requester.async_utils` 패키지 import를 가린다.
+import importlib
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+for sub in ("", "p2p-overlay/kademlia", "verify", "flask-api-server"):
+    path = str(ROOT / sub)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# verify/bench_pod_startup.py가 import 시 requester/를 sys.path에 넣으므로 그 전에 패키지로 먼저 로드해 둔다.
+importlib.import_module("requester")
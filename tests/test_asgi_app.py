@@ -0,0 +1,148 @@
+# flask-api-server/asgi_app.py 테스트. app.py(WSGI)와 같은 상태 코드/응답 본문을 돌려주는지 확인한다.
+# Kubernetes 호출은 가짜로 바꾸고, startup(before_serving)은 실행하지 않는다.
+
+import asyncio
+import json
+import time
+
+import pytest
+
+import asgi_app
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    manifests = []
+
+    async def fake_create(api, manifest):
+        manifests.append(manifest)
+        return manifest
+
+    monkeypatch.setattr(asgi_app, "create_job_from_manifest", fake_create)
+    return manifests
+
+
+def _post(payload=None, **kwargs):
+    async def main():
+        client = asgi_app.app.test_client()
+        if payload is not None:
+            kwargs["json"] = payload
+        response = await client.post("/api/v1/run-job", **kwargs)
+        return response.status_code, await response.get_json()
+
+    return asyncio.run(main())
+
+
+def test_healthz():
+    async def main():
+        response = await asgi_app.app.test_client().get("/healthz")
+        return response.status_code, await response.get_json()
+
+    assert asyncio.run(main()) == (200, {"status": "healthy"})
+
+
+def test_run_job_requires_body(submitted):
+    assert _post({}) == (400, {"error": "요청 본문(JSON)이 필요합니다."})
+    assert _post(data="not json", headers={"Content-Type": "application/json"}) == (
+        400, {"error": "요청 본문(JSON)이 필요합니다."}
+    )
+    assert submitted == []
+
+
+def test_run_job_rejects_bad_node_selector(submitted):
+    assert _post({"command": ["true"], "nodeSelector": "zone=a"}) == (
+        400, {"error": "nodeSelector는 'key=value' 형태의 문자열 리스트여야 합니다."}
+    )
+    assert _post({"command": ["true"], "nodeSelector": ["zone"]}) == (
+        400, {"error": "잘못된 nodeSelector 형식: 'zone' (기대: key=value)"}
+    )
+    assert submitted == []
+
+
+def test_run_job_submit_without_wait(submitted):
+    status, body = _post({"image": "busybox", "command": ["true"], "namespace": "jobs", "nodeSelector": ["zone=a"]})
+    assert status == 202
+    job_name = body["jobName"]
+    assert body == {
+        "status": "Job Submitted",
+        "jobName": job_name,
+        "namespace": "jobs",
+        "message": f"Job '{job_name}'이(가) 성공적으로 제출되었습니다. Job ID: {job_name}",
+    }
+    assert job_name.startswith("web-kata-job-")
+    (manifest,) = submitted
+    assert manifest["metadata"]["name"] == job_name
+    assert manifest["metadata"]["namespace"] == "jobs"
+
+
+class SlowFirstDht:
+    """
+    첫 set이 두 번째 set보다 늦게 끝나는 DHT (노드 탐색 시간이 요청마다 다른 상황).
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.calls = 0
+
+    async def set(self, key, value):
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(0.05)
+        self.data[key] = json.loads(value)
+        return True
+
+
+def test_job_metadata_publishes_in_order(monkeypatch):
+    dht = SlowFirstDht()
+    monkeypatch.setitem(asgi_app.app.config, "KADEMLIA_SERVER", dht)
+
+    async def main():
+        record = {"job_name": "j", "namespace": "ns", "status": "submitted"}
+        asgi_app.schedule_job_publish("j", record)
+        asgi_app.schedule_job_publish("j", dict(record, status="Complete"))
+        while asgi_app.app.config["JOB_PUBLISH_TASKS"]:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert dht.data["j"] == {"job_name": "j", "namespace": "ns", "status": "Complete"}
+    assert asgi_app.app.config["BACKGROUND_TASKS"] == set()
+
+
+def test_providers_endpoint(monkeypatch):
+    from eth_account import Account
+    from heartbeat import ProviderView, heartbeat_key, sign_record
+
+    def _get(path):
+        async def main():
+            response = await asgi_app.app.test_client().get(path)
+            return response.status_code, await response.get_json()
+
+        return asyncio.run(main())
+
+    assert _get("/api/v1/providers")[0] == 503
+
+    class Dht:
+        data = {}
+
+        async def get(self, key):
+            return self.data.get(key)
+
+    big, small = Account.create(), Account.create()
+    dht = Dht()
+    for account, cpu in ((big, 4000), (small, 500)):
+        record = sign_record({
+            "provider": account.address, "publisher": account.address, "seq": 1, "issuedAt": time.time(),
+            "ttl": 20, "runningJobs": 0, "freeCpuMillis": cpu, "freeRamMb": 1024,
+        }, account.key.hex())
+        dht.data[heartbeat_key(account.address)] = json.dumps(record)
+
+    view = ProviderView(dht)
+    asyncio.run(view.refresh([big.address, small.address]))
+    monkeypatch.setitem(asgi_app.app.config, "PROVIDER_VIEW", view)
+
+    status, body = _get("/api/v1/providers")
+    assert status == 200 and body["count"] == 2
+    assert [p["provider"] for p in body["providers"]] == [big.address, small.address]
+    status, body = _get("/api/v1/providers?minCpuMillis=1000")
+    assert [p["provider"] for p in body["providers"]] == [big.address]
+    assert _get("/api/v1/providers?minRamMb=lots")[0] == 400
@@ -0,0 +1,186 @@
+# requester/async_utils.py JobWatcher 테스트. kubernetes_asyncio의 BatchV1Api/Watch를 가짜로 바꿔 클러스터 없이 실행한다.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from kubernetes_asyncio.client import ApiException
+
+from requester import async_utils
+from requester.async_utils import JobWatcher
+
+
+def _job(name, state=None):
+    conditions = [SimpleNamespace(type=state, status="True")] if state else []
+    return SimpleNamespace(metadata=SimpleNamespace(name=name), status=SimpleNamespace(conditions=conditions))
+
+
+class FakeKube:
+    """
+    jobs: read_namespaced_job이 돌려줄 현재 상태 (없으면 404).
+    streams: watch를 열 때마다 쌓이는 이벤트 큐. 큐에 Exception을 넣으면 stream이 그 예외로 끝난다.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.streams = []
+        self.on_read = None
+        kube = self
+
+        class FakeBatch:
+            def __init__(self, api):
+                pass
+
+            async def read_namespaced_job(self, name, namespace):
+                if kube.on_read:
+                    await kube.on_read(name)
+                if name not in kube.jobs:
+                    raise ApiException(status=404)
+                return kube.jobs[name]
+
+            async def list_namespaced_job(self, **kwargs):
+                raise AssertionError("Watch가 대신 호출한다")
+
+        class FakeStream:
+            def __init__(self):
+                self.queue = asyncio.Queue()
+                kube.streams.append(self.queue)
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                item = await self.queue.get()
+                if isinstance(item, Exception):
+                    raise item
+                return item
+
+        class FakeWatch:
+            def stream(self, func, **kwargs):
+                return FakeStream()
+
+        self.batch_cls = FakeBatch
+        self.watch_cls = FakeWatch
+
+    async def emit(self, event_type, job):
+        while not self.streams:
+            await asyncio.sleep(0)
+        await self.streams[-1].put({"type": event_type, "object": job})
+
+
+@pytest.fixture
+def kube(monkeypatch):
+    fake = FakeKube()
+    monkeypatch.setattr(async_utils.client, "BatchV1Api", fake.batch_cls)
+    monkeypatch.setattr(async_utils.watch, "Watch", fake.watch_cls)
+    monkeypatch.setattr(async_utils, "WATCH_RETRY_SECONDS", 0)
+    return fake
+
+
+def test_wait_returns_immediately_for_finished_job(kube):
+    async def main():
+        watcher = JobWatcher(api=None)
+        kube.jobs["a"] = _job("a", "Failed")
+        assert await watcher.wait("a", "ns", timeout=1) == "Failed"
+        assert watcher._waiters == {}
+        await watcher.close()
+
+    asyncio.run(main())
+
+
+def test_many_waits_share_one_watch(kube):
+    async def main():
+        watcher = JobWatcher(api=None)
+        names = [f"job-{i}" for i in range(50)]
+        for n in names:
+            kube.jobs[n] = _job(n)
+        waits = [asyncio.ensure_future(watcher.wait(n, "ns", timeout=5)) for n in names]
+        await asyncio.sleep(0.01)
+        for n in names:
+            await kube.emit("MODIFIED", _job(n))  # 아직 진행 중 이벤트는 무시
+            await kube.emit("MODIFIED", _job(n, "Complete"))
+        assert set(await asyncio.gather(*waits)) == {"Complete"}
+        assert len(kube.streams) == 1
+        assert watcher._waiters == {}
+        await watcher.close()
+
+    asyncio.run(main())
+
+
+def test_event_between_register_and_read_is_not_lost(kube):
+    # GET 응답은 아직 진행 중이지만, 그 사이 watch로 완료 이벤트가 도착한 경우
+    async def main():
+        watcher = JobWatcher(api=None)
+        kube.jobs["a"] = _job("a")
+
+        async def finish_during_read(name):
+            await kube.emit("MODIFIED", _job(name, "Complete"))
+            await asyncio.sleep(0.01)
+
+        kube.on_read = finish_during_read
+        assert await watcher.wait("a", "ns", timeout=1) == "Complete"
+        await watcher.close()
+
+    asyncio.run(main())
+
+
+def test_wait_timeout_and_cancel_clean_up_waiters(kube):
+    async def main():
+        watcher = JobWatcher(api=None)
+        kube.jobs["a"] = _job("a")
+        with pytest.raises(TimeoutError):
+            await watcher.wait("a", "ns", timeout=0.05)
+        assert watcher._waiters == {}
+
+        task = asyncio.ensure_future(watcher.wait("a", "ns", timeout=5))
+        await asyncio.sleep(0.01)
+        assert ("ns", "a") in watcher._waiters
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert watcher._waiters == {}
+        await watcher.close()
+
+    asyncio.run(main())
+
+
+def test_deleted_and_missing_jobs_raise(kube):
+    async def main():
+        watcher = JobWatcher(api=None)
+        with pytest.raises(RuntimeError, match="not found"):
+            await watcher.wait("missing", "ns", timeout=1)
+
+        kube.jobs["a"] = _job("a")
+        task = asyncio.ensure_future(watcher.wait("a", "ns", timeout=5))
+        await asyncio.sleep(0.01)
+        await kube.emit("DELETED", _job("a"))
+        with pytest.raises(RuntimeError, match="not found"):
+            await task
+        assert watcher._waiters == {}
+        await watcher.close()
+
+    asyncio.run(main())
+
+
+def test_watch_restarts_after_error(kube):
+    async def main():
+        watcher = JobWatcher(api=None)
+        kube.jobs["a"] = _job("a")
+        task = asyncio.ensure_future(watcher.wait("a", "ns", timeout=5))
+        await asyncio.sleep(0.01)
+        await kube.streams[0].put(RuntimeError("connection reset"))
+        while len(kube.streams) < 2:
+            await asyncio.sleep(0.01)
+        # 재시작된 watch는 처음 ADDED 이벤트로 현재 상태를 다시 보내 준다.
+        await kube.emit("ADDED", _job("a", "Complete"))
+        assert await task == "Complete"
+        await watcher.close()
+        assert watcher._tasks == {}
+
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+# verify/bench_pod_startup.py의 순수 함수 테스트 (클러스터 없이 SimpleNamespace로 Pod/Event를 흉내 낸다).
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from bench_pod_startup import image_pull_seconds, parse_go_duration, percentile, split_phases
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _at(seconds):
+    return T0 + timedelta(seconds=seconds)
+
+
+def _event(reason, message="", at=None):
+    return SimpleNamespace(reason=reason, message=message, event_time=None, first_timestamp=at, last_timestamp=at)
+
+
+def _pod(conditions, started=None, finished=None, running=False):
+    if running:
+        state = SimpleNamespace(terminated=None, running=SimpleNamespace(started_at=started))
+    elif started is not None:
+        state = SimpleNamespace(terminated=SimpleNamespace(started_at=started, finished_at=finished), running=None)
+    else:
+        state = SimpleNamespace(terminated=None, running=None)
+    return SimpleNamespace(
+        metadata=SimpleNamespace(creation_timestamp=T0),
+        status=SimpleNamespace(
+            conditions=[SimpleNamespace(type=t, status="True", last_transition_time=at) for t, at in conditions],
+            container_statuses=[SimpleNamespace(state=state)],
+        ),
+    )
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("1.5s", 1.5),
+    ("523ms", 0.523),
+    ("1m2.5s", 62.5),
+    ("1h", 3600.0),
+    ("250µs", 0.00025),
+    ("250us", 0.00025),
+    ("100ns", 1e-7),
+])
+def test_parse_go_duration(text, expected):
+    assert parse_go_duration(text) == pytest.approx(expected)
+
+
+def test_parse_go_duration_invalid():
+    assert parse_go_duration("") is None
+    assert parse_go_duration("soon") is None
+
+
+def test_image_pull_seconds_prefers_kubelet_message():
+    events = [
+        _event("Pulling", at=_at(1)),
+        _event("Pulled", 'Successfully pulled image "busybox" in 2.345s (2.345s including waiting)', at=_at(4)),
+    ]
+    assert image_pull_seconds(events) == pytest.approx(2.345)
+
+
+def test_image_pull_seconds_fallbacks():
+    assert image_pull_seconds([_event("Pulled", 'Container image "busybox" already present on machine')]) == 0.0
+    # 메시지에 시간이 없으면 Pulling~Pulled 간격
+    assert image_pull_seconds([_event("Pulling", at=_at(1)), _event("Pulled", "pulled", at=_at(4))]) == 3.0
+    assert image_pull_seconds([_event("Scheduled"), _event("Started")]) is None
+
+
+def test_percentile():
+    values = [4.0, 1.0, 3.0, 2.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == pytest.approx(2.5)
+    assert percentile(values, 100) == 4.0
+    assert percentile(list(range(101)), 99) == pytest.approx(99.0)
+    assert percentile([7.0], 90) == 7.0
+
+
+def test_split_phases_completed_pod():
+    pod = _pod(
+        [("PodScheduled", _at(1)), ("PodReadyToStartContainers", _at(4))],
+        started=_at(7), finished=_at(9),
+    )
+    events = [_event("Pulled", 'Successfully pulled image "busybox" in 2s')]
+    phases = split_phases(pod, events)
+    assert phases == {
+        "scheduling": 1.0,
+        "sandbox": 3.0,
+        "image_pull": 2.0,
+        "container_start": 1.0,  # 4 -> 7 에서 이미지 풀 2초를 뺀 값
+        "create_to_running": 7.0,
+        "create_to_complete": 9.0,
+    }
+
+
+def test_split_phases_running_and_unscheduled_pods():
+    running = split_phases(_pod([("PodScheduled", _at(1))], started=_at(5), running=True), [])
+    assert running["scheduling"] == 1.0
+    assert running["sandbox"] is None
+    assert running["create_to_running"] == 5.0
+    assert running["create_to_complete"] is None
+
+    pending = split_phases(_pod([]), [])
+    assert all(v is None for v in pending.values())
@@ -0,0 +1,266 @@
+# requester/chain.py 테스트. Besu 대신 JSON-RPC 스텁 서버를 띄워 사용한다.
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from eth_abi import encode
+from eth_account import Account
+
+from requester.chain import (
+    BesuRpcClient,
+    MarketClient,
+    NonceManager,
+    ReceiptTracker,
+    RpcError,
+    TOPIC_RESOURCE_REQUESTED,
+    job_id_from_receipt,
+)
+
+REGISTRY = "0x" + "11" * 20
+MARKET = "0x" + "22" * 20
+PROVIDER = "0x" + "33" * 20
+
+
+class StubRpc:
+    """
+    method -> handler(params) 로 응답하는 JSON-RPC 스텁 서버.
+    handler가 dict {"error": ...}를 반환하면 error 응답으로 보낸다.
+    """
+
+    def __init__(self, handlers, reverse_batch=False):
+        self.handlers = handlers
+        self.reverse_batch = reverse_batch
+        self.calls = []
+        self.posts = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.posts += 1
+                if isinstance(body, list):
+                    out = [stub._handle(item) for item in body]
+                    if stub.reverse_batch:
+                        out.reverse()
+                else:
+                    out = stub._handle(body)
+                data = json.dumps(out).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _handle(self, req):
+        self.calls.append(req["method"])
+        result = self.handlers[req["method"]](req["params"])
+        if isinstance(result, dict) and "error" in result:
+            return {"jsonrpc": "2.0", "id": req["id"], "error": result["error"]}
+        return {"jsonrpc": "2.0", "id": req["id"], "result": result}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_factory():
+    stubs = []
+
+    def make(handlers, **kwargs):
+        stub = StubRpc(handlers, **kwargs)
+        stubs.append(stub)
+        return stub
+
+    yield make
+    for stub in stubs:
+        stub.close()
+
+
+def test_batch_preserves_call_order(stub_factory):
+    stub = stub_factory({"echo": lambda params: params[0]}, reverse_batch=True)
+    rpc = BesuRpcClient(stub.url)
+    assert rpc.batch([("echo", [i]) for i in range(5)]) == [0, 1, 2, 3, 4]
+    assert rpc.batch([]) == []
+
+
+def test_batch_splits_into_max_batch_chunks(stub_factory):
+    stub = stub_factory({"echo": lambda params: params[0]}, reverse_batch=True)
+    rpc = BesuRpcClient(stub.url, max_batch=2)
+    assert rpc.batch([("echo", [i]) for i in range(5)]) == [0, 1, 2, 3, 4]
+    assert stub.posts == 3
+
+
+def test_batch_error_mapping(stub_factory):
+    handlers = {
+        "ok": lambda params: "fine",
+        "bad": lambda params: {"error": {"code": -32000, "message": "execution reverted"}},
+    }
+    rpc = BesuRpcClient(stub_factory(handlers).url)
+
+    with pytest.raises(RpcError) as exc:
+        rpc.batch([("ok", []), ("bad", [])])
+    assert exc.value.code == -32000
+    assert exc.value.method == "bad"
+
+    ok, err = rpc.batch([("ok", []), ("bad", [])], raise_on_error=False)
+    assert ok == "fine"
+    assert isinstance(err, RpcError) and err.code == -32000
+
+    with pytest.raises(RpcError):
+        rpc.call("bad")
+
+
+def test_nonce_reservation_is_unique_under_concurrency(stub_factory):
+    stub = stub_factory({"eth_getTransactionCount": lambda params: "0x5"})
+    nonces = NonceManager(BesuRpcClient(stub.url), "0x" + "aa" * 20)
+    got = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(20):
+            n = nonces.reserve()
+            with lock:
+                got.append(n)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(got) == list(range(5, 5 + 160))
+    assert stub.calls.count("eth_getTransactionCount") == 1
+
+
+def test_nonce_release_reuses_gap_and_resync_never_rewinds(stub_factory):
+    chain_nonce = {"value": 0}
+    stub = stub_factory({"eth_getTransactionCount": lambda params: hex(chain_nonce["value"])})
+    nonces = NonceManager(BesuRpcClient(stub.url), "0x" + "aa" * 20)
+
+    assert [nonces.reserve() for _ in range(3)] == [0, 1, 2]
+    nonces.release(1)
+    assert nonces.reserve() == 1
+    assert nonces.reserve() == 3
+
+    # 체인이 뒤처져 있어도 이미 발급한 nonce를 다시 발급하지 않는다.
+    nonces.resync()
+    assert nonces.reserve() == 4
+
+    # 다른 프로세스가 앞서간 경우에는 따라잡는다.
+    chain_nonce["value"] = 10
+    nonces.release(2)
+    nonces.resync()
+    assert nonces.reserve() == 10
+
+
+def test_job_id_from_receipt():
+    job_id = "0x" + "ab" * 32
+    receipt = {
+        "status": "0x1",
+        "logs": [
+            {"topics": ["0x" + "00" * 32]},
+            {"topics": [TOPIC_RESOURCE_REQUESTED, job_id, "0x" + "00" * 12 + "33" * 20]},
+        ],
+    }
+    assert job_id_from_receipt(receipt) == job_id
+    assert job_id_from_receipt(dict(receipt, status="0x0")) is None
+    assert job_id_from_receipt({"status": "0x1", "logs": []}) is None
+
+
+def test_get_nodes_decodes_batched_eth_call(stub_factory):
+    registered = encode(
+        ["address", "string", "uint256", "uint256", "bool"],
+        [PROVIDER, "seoul", 4, 8192, True],
+    )
+    empty = encode(["address", "string", "uint256", "uint256", "bool"], ["0x" + "00" * 20, "", 0, 0, False])
+
+    def eth_call(params):
+        addr = params[0]["data"][-40:]
+        return "0x" + (registered if addr == "33" * 20 else empty).hex()
+
+    stub = stub_factory({"eth_call": eth_call})
+    client = MarketClient(BesuRpcClient(stub.url), REGISTRY, MARKET)
+    nodes = client.get_nodes([PROVIDER, "0x" + "44" * 20])
+
+    assert nodes[0]["owner"].lower() == PROVIDER
+    assert nodes[0]["location"] == "seoul"
+    assert (nodes[0]["cpuUnits"], nodes[0]["ramMb"], nodes[0]["isAvailable"]) == (4, 8192, True)
+    assert nodes[1] is None
+    assert stub.calls == ["eth_call", "eth_call"]  # 한 번의 배치 요청
+
+
+def test_receipt_tracker_times_out_when_node_unreachable():
+    tracker = ReceiptTracker(BesuRpcClient("http://127.0.0.1:9", timeout=0.2), poll_interval=0.05, timeout=0.3)
+    assert tracker._thread is None  # 조회 전용이면 스레드를 띄우지 않는다
+    fut = tracker.track("0x" + "01" * 32)
+    with pytest.raises(TimeoutError):
+        fut.result(timeout=5)
+    tracker.stop()
+
+
+def test_request_computation_detects_duplicate_job_id(stub_factory):
+    job_id = "0x" + "cd" * 32
+    sent = []
+
+    def send_raw(params):
+        sent.append(params[0])
+        return "0x" + ("%064x" % len(sent))
+
+    def receipt(params):
+        return {"status": "0x1", "logs": [{"topics": [TOPIC_RESOURCE_REQUESTED, job_id]}]}
+
+    stub = stub_factory({
+        "eth_getTransactionCount": lambda params: "0x0",
+        "eth_sendRawTransaction": send_raw,
+        "eth_getTransactionReceipt": receipt,
+    })
+    client = MarketClient(
+        BesuRpcClient(stub.url), REGISTRY, MARKET,
+        private_key=Account.create().key.hex(), receipt_poll_interval=0.05,
+    )
+    try:
+        _, first = client.request_computation(PROVIDER)
+        assert job_id_from_receipt(first.result(timeout=5)) == job_id
+        _, second = client.request_computation(PROVIDER)
+        with pytest.raises(RuntimeError, match="중복 jobId"):
+            second.result(timeout=5)
+    finally:
+        client.close()
+
+
+def test_send_keeps_nonce_on_transport_timeout(stub_factory):
+    sent = []
+
+    def send_raw(params):
+        sent.append(params[0])
+        if len(sent) == 1:
+            threading.Event().wait(0.5)  # 클라이언트 타임아웃보다 늦게 응답 (노드는 이미 받았을 수 있음)
+        return "0x" + ("%064x" % len(sent))
+
+    stub = stub_factory({
+        "eth_getTransactionCount": lambda params: "0x0",
+        "eth_sendRawTransaction": send_raw,
+        "eth_getTransactionReceipt": lambda params: None,
+    })
+    client = MarketClient(
+        BesuRpcClient(stub.url, timeout=0.2), REGISTRY, MARKET, private_key=Account.create().key.hex(),
+    )
+    try:
+        with pytest.raises(Exception):
+            client.finalize_job(b"\x01" * 32, True)
+        assert client.nonces._free == []  # 불확실한 nonce는 반납하지 않는다
+        client.finalize_job(b"\x01" * 32, True)
+        assert client.nonces._next == 2  # 다음 전송은 nonce 1을 사용
+        assert stub.calls.count("eth_getTransactionCount") == 2  # 다음 전송 전에 resync
+    finally:
+        client.close()
@@ -0,0 +1,164 @@
+# p2p-overlay/kademlia/heartbeat.py 테스트. Kademlia Server 대신 dict 기반 가짜 DHT를 사용한다.
+
+import asyncio
+import json
+import time
+
+import pytest
+from eth_account import Account
+
+import heartbeat
+from heartbeat import (
+    CLOCK_SKEW_SECONDS,
+    HeartbeatConflict,
+    HeartbeatPublisher,
+    ProviderView,
+    heartbeat_key,
+    sign_record,
+    verify_record,
+)
+
+
+class FakeDht:
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value):
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+
+def _record(account, issued_at, seq=1, ttl=20):
+    return sign_record({
+        "provider": account.address,
+        "publisher": "node-a",
+        "seq": seq,
+        "issuedAt": issued_at,
+        "ttl": ttl,
+        "runningJobs": 0,
+        "freeCpuMillis": 2000,
+        "freeRamMb": 4096,
+    }, account.key.hex())
+
+
+def test_sign_verify_round_trip_and_tamper():
+    account = Account.create()
+    record = _record(account, time.time())
+    assert verify_record(record)
+    # 직렬화 후에도(키 순서가 바뀌어도) 검증되어야 한다.
+    assert verify_record(json.loads(json.dumps(dict(reversed(list(record.items()))))))
+
+    assert not verify_record(dict(record, freeCpuMillis=64000))
+    assert not verify_record(dict(record, provider=Account.create().address))
+    assert not verify_record(dict(record, sig="0x" + "00" * 65))
+    assert not verify_record({k: v for k, v in record.items() if k != "sig"})
+
+
+def test_status_transitions_live_suspect_stale():
+    account = Account.create()
+    dht = FakeDht()
+    view = ProviderView(dht)
+    now = time.time()
+    dht.data[heartbeat_key(account.address)] = json.dumps(_record(account, now, ttl=20))
+
+    asyncio.run(view.refresh([account.address]))
+    assert view.status(account.address, now) == "live"
+    assert view.status(account.address, now + 11) == "suspect"
+    assert view.status(account.address, now + 21) == "stale"
+    assert view.status(Account.create().address) == "unknown"
+
+    # 같은 seq를 다시 받아도 갱신되지 않는다.
+    asyncio.run(view.refresh([account.address]))
+    assert view.status(account.address, now + 21) == "stale"
+
+    # 새 seq를 받으면 다시 live
+    dht.data[heartbeat_key(account.address)] = json.dumps(_record(account, time.time(), seq=2, ttl=20))
+    asyncio.run(view.refresh([account.address]))
+    assert view.status(account.address) == "live"
+    assert view.live_providers(min_cpu_millis=1000)[0]["seq"] == 2
+
+
+def test_refresh_ages_old_record_from_issued_at():
+    # DHT에 남아 있던 오래된(하지만 아직 만료 전) 레코드는 처음 조회해도 live로 보이면 안 된다.
+    account = Account.create()
+    dht = FakeDht()
+    view = ProviderView(dht)
+    now = time.time()
+    dht.data[heartbeat_key(account.address)] = json.dumps(_record(account, now - 17, ttl=20))
+    asyncio.run(view.refresh([account.address]))
+    assert view.status(account.address, now) == "suspect"
+
+    # 공급자 시계가 앞서 있어도 허용치 이상 젊게 보이지 않는다.
+    ahead = Account.create()
+    dht.data[heartbeat_key(ahead.address)] = json.dumps(_record(ahead, now + 60, ttl=20))
+    asyncio.run(view.refresh([ahead.address]))
+    assert view.status(ahead.address, now + 21) == "stale"
+    assert view._last_seen[ahead.address.lower()] <= time.time()
+
+
+def test_refresh_ignores_forged_and_expired_records():
+    account = Account.create()
+    dht = FakeDht()
+    view = ProviderView(dht)
+    now = time.time()
+    forged = dict(_record(account, now), freeCpuMillis=64000)
+    dht.data[heartbeat_key(account.address)] = json.dumps(forged)
+    asyncio.run(view.refresh([account.address]))
+    assert view.status(account.address) == "unknown"
+
+    expired = _record(account, now - 20 - CLOCK_SKEW_SECONDS - 1, ttl=20)
+    dht.data[heartbeat_key(account.address)] = json.dumps(expired)
+    asyncio.run(view.refresh([account.address]))
+    assert view.status(account.address) == "unknown"
+
+
+def _publisher(dht, account, publisher_id, **kwargs):
+    return HeartbeatPublisher(
+        dht, account.key.hex(), capacity_fn=dict, running_jobs_fn=lambda: 0, publisher_id=publisher_id, **kwargs
+    )
+
+
+def test_lowest_publisher_wins_when_key_is_shared():
+    account = Account.create()
+    dht = FakeDht()
+    a = _publisher(dht, account, "node-a")
+    b = _publisher(dht, account, "node-b")
+
+    assert asyncio.run(a.publish_once())
+    assert asyncio.run(a.publish_once())  # 자신의 이전 레코드는 충돌이 아니다
+    with pytest.raises(HeartbeatConflict) as exc:
+        asyncio.run(b.publish_once())
+    record = json.loads(dht.data[heartbeat_key(account.address)])
+    assert record["publisher"] == "node-a"
+    assert exc.value.retry_at == record["issuedAt"] + record["ttl"] + CLOCK_SKEW_SECONDS
+
+    # 동시에 시작해 b가 먼저 썼더라도 a는 계속 발행하고, b는 다음 확인에서 양보한다.
+    dht.data.clear()
+    assert asyncio.run(b.publish_once())
+    assert asyncio.run(a.publish_once())
+    with pytest.raises(HeartbeatConflict):
+        asyncio.run(b.publish_once())
+
+
+def test_publisher_resumes_after_other_record_expires(monkeypatch):
+    # 키를 새 호스트로 옮긴 경우: 이전 호스트 레코드가 만료되면 새 호스트가 발행을 이어받는다.
+    monkeypatch.setattr(heartbeat, "CLOCK_SKEW_SECONDS", 0)
+    account = Account.create()
+    dht = FakeDht()
+    old = _publisher(dht, account, "node-a", ttl=0.3)
+    new = _publisher(dht, account, "node-b", interval=0.05, ttl=0.3)
+
+    async def main():
+        assert await old.publish_once()
+        task = asyncio.ensure_future(new.run())
+        await asyncio.sleep(0.1)
+        assert json.loads(dht.data[heartbeat_key(account.address)])["publisher"] == "node-a"
+        await asyncio.sleep(0.5)
+        assert json.loads(dht.data[heartbeat_key(account.address)])["publisher"] == "node-b"
+        assert not task.done()
+        task.cancel()
+
+    asyncio.run(main())
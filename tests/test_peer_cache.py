@@ -0,0 +1,87 @@
+# p2p-overlay/kademlia/peer_cache.py 테스트. kademlia Server 대신 라우팅 테이블/ping만 흉내 낸다.
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from peer_cache import PeerCache, merge_bootstrap_nodes
+
+
+class FakeServer:
+    def __init__(self, nodes, alive):
+        self.node = SimpleNamespace(id=b"\x00" * 20)
+        self.alive = alive
+        bucket = SimpleNamespace(nodes={n.id: n for n in nodes})
+        self.protocol = SimpleNamespace(router=SimpleNamespace(buckets=[bucket]), ping=self._ping)
+
+    async def _ping(self, addr, node_id):
+        return addr in self.alive, None
+
+
+def _node(i):
+    return SimpleNamespace(id=bytes([i]) * 20, ip=f"10.0.0.{i}", port=8468)
+
+
+def test_probe_records_first_and_last_seen(tmp_path):
+    nodes = [_node(1), _node(2)]
+    server = FakeServer(nodes, alive={("10.0.0.1", 8468)})
+    cache = PeerCache(str(tmp_path / "peers.json"))
+
+    assert asyncio.run(cache.probe(server)) == 1
+    ok, dead = cache.peers["10.0.0.1:8468"], cache.peers["10.0.0.2:8468"]
+    assert ok["lastSeen"] >= ok["firstSeen"] > 0 and ok["rttMs"] is not None
+    assert dead["lastSeen"] == 0 and dead["firstSeen"] > 0
+    # 한 번도 응답하지 않은 피어는 부트스트랩 후보가 아니다.
+    assert cache.bootstrap_candidates() == [("10.0.0.1", 8468)]
+
+
+def test_probe_prunes_peers_that_never_answered(tmp_path):
+    server = FakeServer([_node(2)], alive=set())
+    cache = PeerCache(str(tmp_path / "peers.json"), max_age=60)
+    asyncio.run(cache.probe(server))
+    assert "10.0.0.2:8468" in cache.peers
+
+    cache.peers["10.0.0.2:8468"]["firstSeen"] -= 120
+    asyncio.run(cache.probe(server))
+    assert cache.peers == {}
+
+
+def test_save_load_round_trip(tmp_path):
+    path = tmp_path / "state" / "peers.json"
+    cache = PeerCache(str(path))
+    cache.peers = {"10.0.0.1:8468": {"ip": "10.0.0.1", "port": 8468, "firstSeen": 1.0, "lastSeen": 2.0}}
+    cache.meta = {"nodeId": "ab" * 20}
+    cache.save()
+    assert json.loads(path.read_text())["meta"]["nodeId"] == "ab" * 20
+
+    loaded = PeerCache(str(path))
+    loaded.load()
+    assert loaded.peers == cache.peers and loaded.meta == cache.meta
+
+
+def test_merge_bootstrap_nodes_dedupes_and_keeps_cache_first():
+    cached = [("10.0.0.1", 8468), ("10.0.0.2", "8468")]
+    seeds = [("10.0.0.2", 8468), ("10.0.0.3", 8468)]
+    assert merge_bootstrap_nodes(cached, seeds) == [("10.0.0.1", 8468), ("10.0.0.2", 8468), ("10.0.0.3", 8468)]
+    assert merge_bootstrap_nodes([], None) == []
+
+
+def test_save_on_shutdown_bounds_probe_and_still_saves(tmp_path):
+    class HangingServer(FakeServer):
+        async def _ping(self, addr, node_id):
+            await asyncio.sleep(10)  # 응답 없는 연락처 (rpcudp 타임아웃 대기)
+
+    path = tmp_path / "peers.json"
+    cache = PeerCache(str(path))
+    cache.peers = {"10.0.0.1:8468": {"ip": "10.0.0.1", "port": 8468, "firstSeen": 1.0, "lastSeen": 2.0}}
+    cache.meta = {"nodeId": "ab" * 20}
+
+    async def main():
+        started = asyncio.get_running_loop().time()
+        await cache.save_on_shutdown(HangingServer([_node(2)], alive=set()), probe_timeout=0.1)
+        return asyncio.get_running_loop().time() - started
+
+    assert asyncio.run(main()) < 1
+    saved = json.loads(path.read_text())
+    assert saved["meta"]["nodeId"] == "ab" * 20
+    assert [p["ip"] for p in saved["peers"]] == ["10.0.0.1"]
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# 목적:
+# - runtimeClassName: kata 파드와 기본 runc 파드의 기동 지연을 비교 측정한다.
+# - 런타임 x 리소스 크기 x 동시성 조합마다 파드 묶음을 띄우고, 파드 status/이벤트 타임스탬프로
+#   스케줄링 / 샌드박스 생성 / 이미지 풀 / 컨테이너 시작 구간을 나눈다.
+# - 구간별 백분위 분포를 출력하고 JSON(요약) + CSV(원시 샘플) 리포트로 저장한다.
+# - 이미지 캐시/노드 상태 변화가 한 런타임에만 쏠리지 않도록 런타임별 측정 외 warm-up 파드를 먼저 띄우고,
+#   (리소스 크기, 동시성) 조합마다 런타임을 번갈아(순서도 회전) 실행한다.
+#
+# 사용 예:
+#   python3 verify/bench_pod_startup.py --runtimes kata runc --concurrency 1 8 32 --pods 32 \
+#       --shapes 500m:512Mi 1:1Gi --output bench-reports
+
+import argparse
+import csv
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from kubernetes import client, watch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "requester"))
+from utils import load_kube  # noqa: E402
+
+BENCH_LABEL = "mutual-cloud/bench-run"
+PHASES = [
+    "scheduling",
+    "sandbox",
+    "image_pull",
+    "container_start",
+    "create_to_running",
+    "create_to_complete",
+    "observed_create_to_running",
+    "observed_create_to_complete",
+]
+PERCENTILES = [50, 90, 95, 99]
+# watch가 연속으로 이만큼 실패하면 해당 조합을 중단한다
+MAX_WATCH_FAILURES = 5
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Kata vs runc 파드 기동 지연 벤치마크")
+    p.add_argument("--kubeconfig", type=str, help="KUBECONFIG 경로")
+    p.add_argument("--namespace", type=str, default="default", help="K8s namespace")
+    p.add_argument("--runtimes", type=str, nargs="+", default=["kata", "runc"],
+                   help="비교할 런타임. 'runc'는 runtimeClassName 미지정(기본 런타임)을 의미")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="동시에 진행할 파드 수 목록")
+    p.add_argument("--pods", type=int, default=16, help="조합마다 띄울 파드 수")
+    p.add_argument("--shapes", type=str, nargs="+", default=["500m:512Mi"],
+                   help="리소스 크기 cpu:memory 목록 (requests=limits)")
+    p.add_argument("--image", type=str, default="busybox", help="컨테이너 이미지")
+    p.add_argument("--cmd", type=str, nargs="+", default=["sh", "-c", "true"], help="컨테이너 command")
+    p.add_argument("--node-selector", type=str, nargs="+",
+                   help='nodeSelector key=value 형태 여러 개 지정 가능. 예: katacontainers.io/kata-runtime=true')
+    p.add_argument("--timeout", type=int, default=300, help="파드 하나의 완료 대기 타임아웃(초)")
+    p.add_argument("--warmup", type=int, default=1,
+                   help="측정 전에 런타임마다 띄울 warm-up 파드 수 (결과에서 제외, 0이면 생략)")
+    p.add_argument("--output", type=str, default="bench-reports", help="리포트 저장 디렉터리")
+    return p.parse_args()
+
+
+def parse_node_selector(pairs):
+    if not pairs:
+        return None
+    out = {}
+    for kv in pairs:
+        if "=" not in kv:
+            raise ValueError(f"nodeSelector 항목은 key=value 형식이어야 함: {kv}")
+        k, v = kv.split("=", 1)
+        out[k] = v
+    return out
+
+
+def build_pod_manifest(name, namespace, run_id, runtime, cpu, mem, image, command, node_selector):
+    """
+    벤치마크용 단발성 Pod 매니페스트. Job 컨트롤러 지연이 섞이지 않도록 Pod을 직접 만든다.
+    """
+    pod_spec = {
+        "restartPolicy": "Never",
+        "containers": [{
+            "name": "runner",
+            "image": image,
+            "imagePullPolicy": "IfNotPresent",
+            "command": command,
+            "resources": {
+                "requests": {"cpu": cpu, "memory": mem},
+                "limits": {"cpu": cpu, "memory": mem},
+            },
+        }],
+    }
+    if runtime != "runc":
+        pod_spec["runtimeClassName"] = runtime
+    if node_selector:
+        pod_spec["nodeSelector"] = node_selector
+    return {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {"name": name, "namespace": namespace, "labels": {BENCH_LABEL: run_id}},
+        "spec": pod_spec,
+    }
+
+
+_GO_DURATION = re.compile(r"([\d.]+)(ms|µs|us|ns|s|m|h)")
+_GO_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 1e-3, "us": 1e-6, "µs": 1e-6, "ns": 1e-9}
+
+
+def parse_go_duration(text: str) -> Optional[float]:
+    """
+    '1.234s', '523ms', '1m2.5s' 같은 Go duration 문자열을 초로 변환.
+    """
+    parts = _GO_DURATION.findall(text)
+    if not parts:
+        return None
+    return sum(float(v) * _GO_UNITS[u] for v, u in parts)
+
+
+def image_pull_seconds(events: List) -> Optional[float]:
+    """
+    Pulled 이벤트에서 이미지 풀 시간을 구한다.
+    kubelet 메시지의 'in 1.234s' 값을 우선 사용하고(초 단위보다 정밀), 없으면 Pulling~Pulled 간격을 쓴다.
+    이미지가 이미 있으면 0.
+    """
+    pulling = pulled = None
+    for ev in events:
+        if ev.reason == "Pulled":
+            msg = ev.message or ""
+            if "already present" in msg:
+                return 0.0
+            m = re.search(r" in ([\dhmsuµn.]+)", msg)
+            if m:
+                d = parse_go_duration(m.group(1))
+                if d is not None:
+                    return d
+            pulled = _event_time(ev)
+        elif ev.reason == "Pulling":
+            pulling = _event_time(ev)
+    if pulling and pulled:
+        return (pulled - pulling).total_seconds()
+    return None
+
+
+def _event_time(ev):
+    return ev.event_time or ev.first_timestamp or ev.last_timestamp
+
+
+def _condition_time(pod, cond_type):
+    for c in pod.status.conditions or []:
+        if c.type == cond_type and c.status == "True":
+            return c.last_transition_time
+    return None
+
+
+def _diff(later, earlier) -> Optional[float]:
+    if later is None or earlier is None:
+        return None
+    return (later - earlier).total_seconds()
+
+
+def split_phases(pod, events: List) -> Dict[str, Optional[float]]:
+    """
+    Pod status 타임스탬프(초 단위 해상도)로 기동 구간을 나눈다.
+    - scheduling: 생성 -> PodScheduled
+    - sandbox: PodScheduled -> PodReadyToStartContainers (Kata는 여기서 VM 부팅)
+    - image_pull: Pulled 이벤트 기준
+    - container_start: 샌드박스 준비 -> 컨테이너 startedAt 에서 이미지 풀 시간을 뺀 값
+    """
+    created = pod.metadata.creation_timestamp
+    scheduled = _condition_time(pod, "PodScheduled")
+    sandbox_ready = _condition_time(pod, "PodReadyToStartContainers")
+
+    started = finished = None
+    statuses = pod.status.container_statuses or []
+    if statuses:
+        state = statuses[0].state
+        if state.terminated:
+            started, finished = state.terminated.started_at, state.terminated.finished_at
+        elif state.running:
+            started = state.running.started_at
+
+    pull = image_pull_seconds(events)
+    container_start = _diff(started, sandbox_ready)
+    if container_start is not None and pull is not None:
+        container_start = max(0.0, container_start - pull)
+
+    return {
+        "scheduling": _diff(scheduled, created),
+        "sandbox": _diff(sandbox_ready, scheduled),
+        "image_pull": pull,
+        "container_start": container_start,
+        "create_to_running": _diff(started, created),
+        "create_to_complete": _diff(finished, created),
+    }
+
+
+class PodWatcher:
+    """
+    벤치마크 run 라벨로 파드를 하나의 watch로 추적한다.
+    파드별로 kubectl/GET을 반복하지 않고, 관측 시각(ms 해상도)과 최종 Pod 객체를 기록한다.
+    watch가 끊기면(410 Gone 등) 다시 list해서 상태를 맞춘 뒤 재시작하고,
+    연속으로 MAX_WATCH_FAILURES번 실패하면 error를 기록하고 대기 중인 파드를 모두 깨운다.
+    """
+
+    def __init__(self, namespace: str, run_id: str):
+        self.namespace = namespace
+        self.run_id = run_id
+        self.pods = {}
+        self.running_at = {}
+        self.done = {}
+        self.error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._watch = watch.Watch()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def register(self, name: str) -> threading.Event:
+        with self._lock:
+            ev = self.done.setdefault(name, threading.Event())
+            if self.error is not None:
+                ev.set()
+            return ev
+
+    def _observe(self, pod, now: float):
+        name = pod.metadata.name
+        with self._lock:
+            self.pods[name] = pod
+            if pod.status.phase in ("Running", "Succeeded", "Failed"):
+                self.running_at.setdefault(name, now)
+            if pod.status.phase in ("Succeeded", "Failed"):
+                self.done.setdefault(name, threading.Event()).set()
+
+    def _run(self):
+        core = client.CoreV1Api()
+        selector = f"{BENCH_LABEL}={self.run_id}"
+        failures = 0
+        while not self._stopped:
+            try:
+                # watch 사이에 놓친 상태 변화를 list로 따라잡고, 그 resourceVersion부터 watch를 이어간다.
+                pods = core.list_namespaced_pod(namespace=self.namespace, label_selector=selector)
+                now = time.time()
+                for pod in pods.items:
+                    self._observe(pod, now)
+                for event in self._watch.stream(
+                    core.list_namespaced_pod,
+                    namespace=self.namespace,
+                    label_selector=selector,
+                    resource_version=pods.metadata.resource_version,
+                ):
+                    failures = 0
+                    self._observe(event["object"], time.time())
+            except Exception as e:
+                if self._stopped:
+                    return
+                failures += 1
+                print(f"[bench] 파드 watch 오류 ({failures}/{MAX_WATCH_FAILURES}): {e}", file=sys.stderr)
+                if failures >= MAX_WATCH_FAILURES:
+                    with self._lock:
+                        self.error = e
+                        for ev in self.done.values():
+                            ev.set()
+                    return
+                time.sleep(1)
+
+    def stop(self):
+        self._stopped = True
+        self._watch.stop()
+
+
+def run_one(core, watcher: PodWatcher, manifest: Dict, timeout: int) -> Dict:
+    name = manifest["metadata"]["name"]
+    done = watcher.register(name)
+    t0 = time.time()
+    core.create_namespaced_pod(namespace=manifest["metadata"]["namespace"], body=manifest)
+    finished = done.wait(timeout)
+    t1 = time.time()
+    if watcher.error is not None:
+        raise RuntimeError(f"파드 watch 실패로 측정을 중단합니다: {watcher.error}")
+    return {
+        "pod": name,
+        "timedOut": not finished,
+        "observed_create_to_running": watcher.running_at.get(name, t1) - t0 if finished else None,
+        "observed_create_to_complete": t1 - t0 if finished else None,
+    }
+
+
+def run_config(args, runtime, shape, concurrency, node_selector, pods: Optional[int] = None) -> List[Dict]:
+    """
+    한 조합(런타임, 리소스 크기, 동시성)에 대해 pods(기본 args.pods) 개의 파드를 띄우고 샘플 목록을 반환한다.
+    """
+    core = client.CoreV1Api()
+    cpu, mem = shape.split(":", 1)
+    run_id = uuid.uuid4().hex[:10]
+    watcher = PodWatcher(args.namespace, run_id)
+    watcher.start()
+
+    manifests = [
+        build_pod_manifest(
+            f"bench-{runtime}-{run_id}-{i}", args.namespace, run_id, runtime, cpu, mem,
+            args.image, args.cmd, node_selector,
+        )
+        for i in range(pods or args.pods)
+    ]
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda m: run_one(core, watcher, m, args.timeout), manifests))
+
+        # 이미지 풀 이벤트는 Pod status에 없으므로 Pod 이벤트를 한 번에 읽어 이번 run의 파드만 uid로 묶는다.
+        # (field selector는 이름 OR 조건을 지원하지 않으므로 이름 필터는 클라이언트에서 한다)
+        names = {m["metadata"]["name"] for m in manifests}
+        events_by_uid = {}
+        for ev in core.list_namespaced_event(
+            namespace=args.namespace, field_selector="involvedObject.kind=Pod"
+        ).items:
+            obj = ev.involved_object
+            if obj and obj.uid and obj.name in names:
+                events_by_uid.setdefault(obj.uid, []).append(ev)
+
+        samples = []
+        for r in results:
+            pod = watcher.pods.get(r["pod"])
+            sample = {"runtime": runtime, "shape": shape, "concurrency": concurrency}
+            sample.update(r)
+            if pod is not None:
+                sample["phase"] = pod.status.phase
+                sample.update(split_phases(pod, events_by_uid.get(pod.metadata.uid, [])))
+            samples.append(sample)
+        return samples
+    finally:
+        watcher.stop()
+        core.delete_collection_namespaced_pod(
+            namespace=args.namespace, label_selector=f"{BENCH_LABEL}={run_id}"
+        )
+
+
+def percentile(values: List[float], p: float) -> float:
+    s = sorted(values)
+    k = (len(s) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    out = {
+        "pods": len(samples),
+        "succeeded": sum(1 for s in samples if s.get("phase") == "Succeeded"),
+        "timedOut": sum(1 for s in samples if s.get("timedOut")),
+        "phases": {},
+    }
+    for phase in PHASES:
+        values = [s[phase] for s in samples if s.get(phase) is not None]
+        if not values:
+            continue
+        stats = {"count": len(values), "min": min(values), "max": max(values), "mean": sum(values) / len(values)}
+        for p in PERCENTILES:
+            stats[f"p{p}"] = percentile(values, p)
+        out["phases"][phase] = stats
+    return out
+
+
+def print_summary(key: str, summary: Dict):
+    print(f"[bench] {key}: pods={summary['pods']} succeeded={summary['succeeded']} timedOut={summary['timedOut']}")
+    for phase, st in summary["phases"].items():
+        print(f"    {phase:<28} p50={st['p50']:7.3f}s p90={st['p90']:7.3f}s p99={st['p99']:7.3f}s max={st['max']:7.3f}s")
+
+
+def main():
+    args = parse_args()
+    node_selector = parse_node_selector(args.node_selector)
+    load_kube(args.kubeconfig)
+
+    out_dir = Path(args.output)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+
+    all_samples = []
+    report = {
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+        "params": {
+            "namespace": args.namespace,
+            "runtimes": args.runtimes,
+            "concurrency": args.concurrency,
+            "pods": args.pods,
+            "shapes": args.shapes,
+            "image": args.image,
+            "command": args.cmd,
+            "nodeSelector": node_selector,
+            "warmup": args.warmup,
+        },
+        "note": "서버 타임스탬프 기반 구간(scheduling~create_to_complete)은 초 단위 해상도, observed_* 는 클라이언트 관측값(ms).",
+        "results": {},
+    }
+    # 측정 외 warm-up: 이미지 풀과 런타임 첫 기동(Kata 커널/이미지 캐시 등) 비용을 결과에서 뺀다.
+    if args.warmup > 0:
+        for runtime in args.runtimes:
+            print(f"[bench] {runtime}: warm-up 파드 {args.warmup}개 실행 중...")
+            try:
+                run_config(args, runtime, args.shapes[0], 1, node_selector, pods=args.warmup)
+            except Exception as e:
+                print(f"[bench] {runtime} warm-up 중 오류 발생: {e}", file=sys.stderr)
+
+    # 런타임을 가장 안쪽 루프에 두어 같은 조합끼리 시간상 가깝게 측정하고, 매 조합마다 순서를 회전한다.
+    rounds = 0
+    for shape in args.shapes:
+        for concurrency in args.concurrency:
+            offset = rounds % len(args.runtimes)
+            rounds += 1
+            for runtime in args.runtimes[offset:] + args.runtimes[:offset]:
+                key = f"{runtime}/{shape}/c{concurrency}"
+                print(f"[bench] {key}: 파드 {args.pods}개 실행 중...")
+                try:
+                    samples = run_config(args, runtime, shape, concurrency, node_selector)
+                except Exception as e:
+                    print(f"[bench] {key} 실행 중 오류 발생: {e}", file=sys.stderr)
+                    report["results"][key] = {"error": str(e)}
+                    continue
+                all_samples.extend(samples)
+                summary = summarize(samples)
+                report["results"][key] = summary
+                print_summary(key, summary)
+
+    json_path = out_dir / f"pod-startup-{stamp}.json"
+    with json_path.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    csv_path = out_dir / f"pod-startup-{stamp}.csv"
+    fields = ["runtime", "shape", "concurrency", "pod", "phase", "timedOut"] + PHASES
+    with csv_path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(all_samples)
+
+    print(f"[bench] 리포트 저장: {json_path}, {csv_path}")
+
+
+if __name__ == "__main__":
+    main()